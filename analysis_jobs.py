@@ -0,0 +1,195 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Background threads running analysis jobs
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+# Jobs waiting for a worker before new submissions are refused
+JOB_MAX_QUEUED = int(os.environ.get("JOB_MAX_QUEUED", "100"))
+# Seconds a finished job (and its result) stays available
+JOB_TTL = float(os.environ.get("JOB_TTL", "3600"))
+
+FINISHED_STATES = ("done", "failed")
+
+class JobQueueFull(Exception):
+    """Too many jobs are waiting for a worker"""
+
+class Job:
+    """State of one background job; changed only by its JobQueue, under the queue's lock"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.state = "queued"
+        self.stage = None
+        self.stages = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.version = 0
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "state": self.state,
+            "stage": self.stage,
+            "stages": [dict(stage) for stage in self.stages],
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "version": self.version,
+        }
+
+class JobQueue:
+    """
+    In-process background job runner with progress tracking
+
+    A submitted function runs on one of a fixed number of worker threads
+    and reports the pipeline stage it enters through a callback. Callers
+    poll a job's state with get() or block until it changes with wait();
+    finished jobs are dropped ttl seconds after they end. Jobs live in the
+    web process (the app runs as one gunicorn process with threads), so
+    they are lost on restart.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, max_queued=JOB_MAX_QUEUED, ttl=JOB_TTL):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis-job")
+        self._jobs = {}
+        self._changed = threading.Condition()
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, function, *args):
+        """
+        Queue a job
+
+        Args:
+            function (callable): Called as function(report_stage, *args) on a
+                worker thread; its return value is the job result (which
+                should be JSON-serializable)
+            *args: Arguments passed to the function
+
+        Returns:
+            str: Job id
+
+        Raises:
+            JobQueueFull: When max_queued jobs are already waiting
+        """
+        with self._changed:
+            self._prune()
+            if sum(job.state == "queued" for job in self._jobs.values()) >= self.max_queued:
+                raise JobQueueFull(f"{self.max_queued} jobs are already waiting")
+            job = Job()
+            self._jobs[job.id] = job
+        self._pool.submit(self._run, job, function, args)
+        return job.id
+
+    def _update(self, job, **changes):
+        with self._changed:
+            now = time.time()
+            if "stage" in changes:
+                if job.stages:
+                    job.stages[-1]["finished_at"] = now
+                if changes["stage"] is not None:
+                    job.stages.append({"name": changes["stage"], "started_at": now, "finished_at": None})
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.updated_at = now
+            job.version += 1
+            self._changed.notify_all()
+
+    def _run(self, job, function, args):
+        self._update(job, state="running")
+        start = time.perf_counter()
+        try:
+            result = function(lambda stage: self._update(job, stage=stage), *args)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed in stage {job.stage}: {str(e)}")
+            with self._changed:
+                self.failed += 1
+            self._update(job, state="failed", error=str(e), stage=None)
+            return
+        with self._changed:
+            self.completed += 1
+        self._update(job, state="done", result=result, stage=None)
+        logger.debug(f"Job {job.id} done in {time.perf_counter() - start:.2f} s")
+
+    def _prune(self):
+        """Forget jobs that finished more than ttl seconds ago (called with the lock held)"""
+        expired = time.time() - self.ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.state in FINISHED_STATES and job.updated_at < expired]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """
+        Returns a snapshot of a job (see Job.to_dict), or None if it is unknown or expired
+        """
+        with self._changed:
+            self._prune()
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job is not None else None
+
+    def wait(self, job_id, version, timeout):
+        """
+        Block until a job changes past the given version
+
+        Args:
+            job_id (str): Job id
+            version (int): Last version seen (-1 for none)
+            timeout (float): Seconds to wait at most
+
+        Returns:
+            dict: Snapshot of the job (unchanged if the wait timed out), or
+                None if the job is unknown or expired
+        """
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            self._changed.wait_for(lambda: job.version > version or job.state in FINISHED_STATES,
+                                   timeout=timeout)
+            return job.to_dict()
+
+    def stats(self):
+        """
+        Returns job counters for health checks
+
+        Returns:
+            dict: queued, running, completed, failed and the number of workers
+        """
+        with self._changed:
+            states = [job.state for job in self._jobs.values()]
+            return {
+                "queued": states.count("queued"),
+                "running": states.count("running"),
+                "completed": self.completed,
+                "failed": self.failed,
+                "workers": self.workers,
+            }
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_job_queue():
+    """Returns the process-wide job queue, starting it on first use"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
+
+def get_status():
+    """Returns the job queue statistics, or None if it has not been started"""
+    return _queue.stats() if _queue is not None else None
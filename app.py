@@ -1,11 +1,23 @@
 import os
+import time
 import logging
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for
+import tempfile
+import threading
+from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, Response, stream_with_context
 from werkzeug.utils import secure_filename
 import json
-from text_extractor import extract_text_from_image, extract_text_from_pdf
-from web_scraper import get_food_information
-from rag_engine import analyze_prescription, check_food_safety
+import hashlib
+from text_extractor import extract_text_from_image, extract_text_from_pdf, EXTRACTOR_VERSION
+from web_scraper import get_food_information, get_food_cache
+from rag_engine import analyze_prescription, check_food_safety, check_food_safety_batch
+import model_registry
+import ocr_server
+from cache_store import SQLiteCache
+from food_names import normalize_food_name
+from http_client import get_client
+from wiki_text import extraction_stats
+import analysis_jobs
+from analysis_jobs import get_job_queue, JobQueueFull, FINISHED_STATES
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -18,16 +30,153 @@ app.secret_key = os.environ.get("SESSION_SECRET", "dev_secret_key")
 # Configure upload folder
 UPLOAD_FOLDER = '/tmp/uploads'
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg'}
+MAX_BATCH_FOODS = 50  # foods per /analyze/batch request
+# Analysis jobs extracting text at the same time (the other stages are not limited)
+JOB_OCR_CONCURRENCY = int(os.environ.get("JOB_OCR_CONCURRENCY", "2"))
+# Seconds between keep-alive comments on a job event stream, and its maximum duration
+JOB_EVENTS_HEARTBEAT = 15
+JOB_EVENTS_TIMEOUT = float(os.environ.get("JOB_EVENTS_TIMEOUT", "300"))
+# Open job event streams allowed at once: each one holds a web thread (gunicorn
+# runs with --threads 8), so polling /jobs/<id> is the default way to follow a job
+JOB_EVENTS_MAX_STREAMS = int(os.environ.get("JOB_EVENTS_MAX_STREAMS", "2"))
+# Seconds clients are asked to wait between polls
+JOB_POLL_INTERVAL = 1
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload
 
 # Create upload folder if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Extracted prescription text, keyed by the SHA-256 of the uploaded file, so
+# re-uploads of the same prescription skip OCR entirely
+extraction_cache = SQLiteCache(
+    os.environ.get("EXTRACTION_CACHE_PATH", "/tmp/healthy_cache/extraction.sqlite3"),
+    max_bytes=int(os.environ.get("EXTRACTION_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+# Load the OCR model in the background so the worker can serve requests right away.
+# Set MODEL_WARMUP=0 to load it lazily on the first image upload instead.
+if os.environ.get("MODEL_WARMUP", "1") != "0":
+    model_registry.start_warmup()
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def save_upload(file):
+    """
+    Spool an uploaded prescription to its own file in the upload folder
+    
+    Every upload gets a unique name, so concurrent uploads of the same file
+    never share a path (the content hash is only the cache key).
+    
+    Args:
+        file (FileStorage): Uploaded PDF or image
+        
+    Returns:
+        str: Path of the saved file (the caller removes it)
+    """
+    filename = secure_filename(str(file.filename))
+    fd, filepath = tempfile.mkstemp(dir=app.config['UPLOAD_FOLDER'], suffix=os.path.splitext(filename)[1])
+    with os.fdopen(fd, 'wb') as f:
+        file.save(f)
+    return filepath
+
+def extract_prescription_text(file):
+    """
+    Extract the text of an uploaded prescription, using the extraction cache
+    
+    Args:
+        file (FileStorage): Uploaded PDF or image
+        
+    Returns:
+        str: Extracted text (empty if nothing could be extracted)
+    """
+    filepath = save_upload(file)
+    try:
+        return extract_prescription_file(filepath)
+    finally:
+        # Cleanup the uploaded file
+        os.remove(filepath)
+
+def extract_prescription_file(filepath):
+    """
+    Extract the text of a saved prescription file, using the extraction cache
+    
+    Args:
+        filepath (str): PDF or image file (its extension selects the extractor)
+        
+    Returns:
+        str: Extracted text (empty if nothing could be extracted)
+    """
+    with open(filepath, 'rb') as f:
+        digest = hashlib.file_digest(f, 'sha256').hexdigest()
+    cache_key = f"{EXTRACTOR_VERSION}:{digest}"
+    cached_text = extraction_cache.get(cache_key)
+    if cached_text is not None:
+        logger.debug(f"Extraction cache hit for {cache_key}")
+        return cached_text
+    
+    if filepath.lower().endswith('.pdf'):
+        prescription_text = extract_text_from_pdf(filepath)
+    else:  # Image files
+        prescription_text = extract_text_from_image(filepath)
+    
+    # Failed extractions are not cached so a retry gets another chance
+    if prescription_text:
+        extraction_cache.set(cache_key, prescription_text)
+    return prescription_text
+
+# Limits how many jobs run OCR at once, independently of the number of job workers
+ocr_job_slots = threading.BoundedSemaphore(JOB_OCR_CONCURRENCY)
+
+# Limits how many web threads job event streams can hold
+event_stream_slots = threading.BoundedSemaphore(JOB_EVENTS_MAX_STREAMS)
+
+def run_analysis_job(report_stage, food_product, filepath):
+    """
+    The /analyze pipeline, run by a background job worker
+    
+    Args:
+        report_stage (callable): Called with the name of each stage as it starts
+        food_product (str): Food name as entered
+        filepath (str): Prescription spooled by save_upload (removed here)
+        
+    Returns:
+        dict: The restrictions and the verdict for the food (see /jobs/<id>)
+    """
+    report_stage("extracting_text")
+    try:
+        with ocr_job_slots:
+            prescription_text = extract_prescription_file(filepath)
+    finally:
+        os.remove(filepath)
+    if not prescription_text:
+        raise ValueError("Could not extract text from the prescription. Please try a clearer image or PDF.")
+    
+    report_stage("analyzing_prescription")
+    restrictions = analyze_prescription(prescription_text)
+    
+    report_stage("fetching_food_information")
+    food_key = normalize_food_name(food_product)
+    logger.info(f"Food request: {food_key}")  # read by warm_cache.py --log
+    food_info = get_food_information(food_key)
+    
+    report_stage("checking_safety")
+    result = check_food_safety(food_key, food_info, restrictions)
+    return {
+        "food_product": food_product,
+        "restrictions": restrictions,
+        "is_safe": result["is_safe"],
+        "recommendation": result["recommendation"],
+        "explanation": result["explanation"],
+        "unsafe_ingredients": result["unsafe_ingredients"],
+        "benefits": result["benefits"],
+        "health_risks": result["health_risks"],
+        "nutrients": result["nutrients"],
+        "source": result["food_info"].get("source"),
+    }
+
 @app.route('/')
 def landing():
     return render_template('landing.html')
@@ -36,6 +185,27 @@ def landing():
 def index():
     return render_template('index.html')
 
+@app.route('/health')
+def health():
+    # Liveness: the worker is up, whatever state the models are in
+    return jsonify({
+        "status": "ok",
+        "models": model_registry.get_status(),
+        "ocr_server": ocr_server.get_status(),
+        "extraction_cache": extraction_cache.stats(),
+        "food_cache": get_food_cache().stats(),
+        "http_client": get_client().stats(),
+        "wikipedia": extraction_stats.stats(),
+        "jobs": analysis_jobs.get_status(),
+    })
+
+@app.route('/ready')
+def ready():
+    # Readiness: 503 until the OCR model has finished loading
+    models = model_registry.get_status()
+    is_ready = all(info["state"] == "ready" for info in models.values())
+    return jsonify({"ready": is_ready, "models": models}), 200 if is_ready else 503
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
     try:
@@ -59,34 +229,26 @@ def analyze():
             flash('Invalid file type. Please upload PDF or image files.', 'danger')
             return redirect(url_for('index'))
         
-        # Save the file
-        filename = secure_filename(str(file.filename))
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
-        # Extract text from prescription
-        prescription_text = ""
-        if filename.lower().endswith('.pdf'):
-            prescription_text = extract_text_from_pdf(filepath)
-        else:  # Image files
-            prescription_text = extract_text_from_image(filepath)
+        # Extract text from prescription (served from cache for repeat uploads)
+        prescription_text = extract_prescription_text(file)
         
         # Check if extraction was successful
         if not prescription_text:
             flash('Could not extract text from the prescription. Please try a clearer image or PDF.', 'warning')
             return redirect(url_for('index'))
         
+        # Canonical food name: every cache and index downstream is keyed on it
+        food_key = normalize_food_name(food_product)
+        logger.info(f"Food request: {food_key}")  # read by warm_cache.py --log
+        
         # Get food information through web scraping
-        food_info = get_food_information(food_product)
+        food_info = get_food_information(food_key)
         
         # Analyze prescription for dietary restrictions
         restrictions = analyze_prescription(prescription_text)
         
         # Check if food is safe based on restrictions
-        result = check_food_safety(food_product, food_info, restrictions)
-        
-        # Cleanup the uploaded file
-        os.remove(filepath)
+        result = check_food_safety(food_key, food_info, restrictions)
         
         # Return the result page
         return render_template('result.html', 
@@ -105,6 +267,173 @@ def analyze():
         flash(f'An error occurred during analysis: {str(e)}', 'danger')
         return redirect(url_for('index'))
 
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """
+    Check a list of foods against one uploaded prescription
+    
+    Expects a multipart form with a "prescription" file and one or more
+    "food_names" fields (each may hold several names separated by commas or
+    newlines). Returns JSON with the restrictions and a verdict per food.
+    """
+    try:
+        # Collect the food names
+        food_names = []
+        for value in request.form.getlist('food_names'):
+            food_names.extend(name.strip() for name in value.replace('\n', ',').split(','))
+        food_names = [name for name in food_names if name]
+        if not food_names:
+            return jsonify({"error": "Please provide at least one food name"}), 400
+        if len(food_names) > MAX_BATCH_FOODS:
+            return jsonify({"error": f"At most {MAX_BATCH_FOODS} foods can be checked at once"}), 400
+        
+        # Validate the prescription file
+        file = request.files.get('prescription')
+        if file is None or not file.filename or not allowed_file(file.filename):
+            return jsonify({"error": "Please upload a PDF or image prescription"}), 400
+        
+        # Extract and analyze the prescription once for all foods
+        prescription_text = extract_prescription_text(file)
+        if not prescription_text:
+            return jsonify({"error": "Could not extract text from the prescription"}), 422
+        restrictions = analyze_prescription(prescription_text)
+        
+        for food_name in food_names:
+            logger.info(f"Food request: {normalize_food_name(food_name)}")
+        results = check_food_safety_batch(food_names, restrictions)
+        
+        return jsonify({
+            "restrictions": restrictions,
+            "results": [
+                {
+                    "food_name": result["food_name"],
+                    "is_safe": result["is_safe"],
+                    "recommendation": result["recommendation"],
+                    "explanation": result["explanation"],
+                    "unsafe_ingredients": result["unsafe_ingredients"],
+                    "benefits": result["benefits"],
+                    "health_risks": result["health_risks"],
+                    "nutrients": result["nutrients"],
+                    "source": result["food_info"].get("source"),
+                }
+                for result in results
+            ],
+        })
+    
+    except Exception as e:
+        logger.error(f"Error in batch analysis: {str(e)}")
+        return jsonify({"error": f"An error occurred during analysis: {str(e)}"}), 500
+
+@app.route('/jobs/analyze', methods=['POST'])
+def submit_analysis_job():
+    """
+    Start an /analyze run in the background
+    
+    Takes the same form as /analyze and returns 202 with the job id at once.
+    Clients follow the job by polling /jobs/<id> every poll_interval seconds
+    (progress, then the result); /jobs/<id>/events streams the same updates
+    as server-sent events, but only JOB_EVENTS_MAX_STREAMS streams may be
+    open at once. /jobs/<id>/result renders the result page.
+    """
+    food_product = request.form.get('food_name', '').strip()
+    if not food_product:
+        return jsonify({"error": "Please enter a food product name"}), 400
+    
+    file = request.files.get('prescription')
+    if file is None or not file.filename or not allowed_file(file.filename):
+        return jsonify({"error": "Please upload a PDF or image prescription"}), 400
+    
+    # Queued jobs hold a path, not the upload's bytes
+    filepath = save_upload(file)
+    try:
+        job_id = get_job_queue().submit(run_analysis_job, food_product, filepath)
+    except JobQueueFull as e:
+        os.remove(filepath)
+        logger.warning(f"Analysis job refused: {str(e)}")
+        return jsonify({"error": "Too many analyses in progress. Please try again shortly."}), 503
+    
+    response = jsonify({
+        "job_id": job_id,
+        "status_url": url_for('job_status', job_id=job_id),
+        "events_url": url_for('job_events', job_id=job_id),
+        "result_url": url_for('job_result', job_id=job_id),
+        "poll_interval": JOB_POLL_INTERVAL,
+    })
+    response.headers['Location'] = url_for('job_status', job_id=job_id)
+    return response, 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """
+    Server-sent events for a job: one "progress" event per change, then a
+    final "done" or "failed" event carrying the result or the error
+    
+    Each open stream holds a web thread, so at most JOB_EVENTS_MAX_STREAMS
+    run at once; beyond that the client gets 429 and should poll /jobs/<id>.
+    """
+    jobs = get_job_queue()
+    if jobs.get(job_id) is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    if not event_stream_slots.acquire(blocking=False):
+        response = jsonify({"error": "Too many open event streams; poll the status URL instead",
+                            "status_url": url_for('job_status', job_id=job_id),
+                            "poll_interval": JOB_POLL_INTERVAL})
+        response.headers['Retry-After'] = str(JOB_POLL_INTERVAL)
+        return response, 429
+    
+    def stream():
+        version = -1
+        deadline = time.monotonic() + JOB_EVENTS_TIMEOUT
+        while time.monotonic() < deadline:
+            job = jobs.wait(job_id, version, timeout=JOB_EVENTS_HEARTBEAT)
+            if job is None:
+                return
+            if job["version"] == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = job["version"]
+            event = job["state"] if job["state"] in FINISHED_STATES else "progress"
+            yield f"event: {event}\ndata: {json.dumps(job)}\n\n"
+            if job["state"] in FINISHED_STATES:
+                return
+    
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Released when the server closes the response (stream ended or client gone)
+    response.call_on_close(event_stream_slots.release)
+    return response
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        flash('This analysis has expired. Please submit it again.', 'warning')
+        return redirect(url_for('index'))
+    if job["state"] == "failed":
+        flash(f'An error occurred during analysis: {job["error"]}', 'danger')
+        return redirect(url_for('index'))
+    if job["state"] != "done":
+        return jsonify(job), 202
+    
+    result = job["result"]
+    return render_template('result.html',
+                          food_product=result['food_product'],
+                          is_safe=result['is_safe'],
+                          recommendation=result['recommendation'],
+                          explanation=result['explanation'],
+                          benefits=result['benefits'],
+                          health_risks=result['health_risks'],
+                          restrictions=result['restrictions'],
+                          nutrients=result['nutrients'],
+                          result=result)
+
 @app.errorhandler(413)
 def request_entity_too_large(error):
     flash('File too large. Maximum file size is 16MB.', 'danger')
@@ -0,0 +1,102 @@
+"""
+FoodData Central store benchmark
+
+Writes a synthetic FDC CSV download (or uses a real one with --source),
+imports it into a temporary store and reports import time, file size and
+lookup latency for exact and word-based (full-text) name matches.
+
+Usage:
+    python benchmarks/bench_fdc_store.py [--foods 300000] [--lookups 5000] [--source DIR_OR_JSON]
+"""
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from fdc_store import FDCStore, NUTRIENTS, import_fdc  # noqa: E402
+
+WORDS = (
+    "apple banana orange chicken beef pork rice bread milk cheese yogurt egg salmon tuna "
+    "potato tomato carrot spinach broccoli bean lentil oat wheat corn almond peanut "
+    "raw cooked boiled fried roasted canned frozen dried whole skim lowfat sweetened salted"
+).split()
+
+DATA_TYPES = ["foundation_food", "sr_legacy_food", "survey_fndds_food", "branded_food"]
+
+def synthetic_download(directory, n_foods, rng):
+    """Write food.csv and food_nutrient.csv shaped like the FDC CSV download"""
+    descriptions = []
+    with open(os.path.join(directory, "food.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["fdc_id", "data_type", "description", "food_category_id", "publication_date"])
+        for fdc_id in range(1, n_foods + 1):
+            description = ", ".join(rng.sample(WORDS, rng.randint(1, 4)))
+            descriptions.append(description)
+            writer.writerow([fdc_id, rng.choice(DATA_TYPES), description, "", "2024-04-18"])
+
+    nutrient_ids = sorted(NUTRIENTS)
+    with open(os.path.join(directory, "food_nutrient.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "fdc_id", "nutrient_id", "amount"])
+        row_id = 0
+        for fdc_id in range(1, n_foods + 1):
+            for nutrient_id in nutrient_ids:
+                row_id += 1
+                writer.writerow([row_id, fdc_id, nutrient_id, round(rng.uniform(0, 500), 2)])
+    return descriptions
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def time_lookups(store, queries):
+    timings, found = [], 0
+    for query in queries:
+        start = time.perf_counter()
+        found += store.lookup(query) is not None
+        timings.append((time.perf_counter() - start) * 1000)
+    return (f"p50 {statistics.median(timings):.3f} ms, p95 {percentile(timings, 0.95):.3f} ms, "
+            f"found {found}/{len(queries)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the FoodData Central import and lookups")
+    parser.add_argument("--foods", type=int, default=300000, help="synthetic download size")
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--source", help="real FDC CSV directory or JSON file")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.source:
+            source, descriptions = args.source, None
+        else:
+            source = os.path.join(tmp, "download")
+            os.makedirs(source)
+            start = time.perf_counter()
+            descriptions = synthetic_download(source, args.foods, rng)
+            print(f"generated {args.foods} foods in {time.perf_counter() - start:.1f} s")
+
+        db_path = os.path.join(tmp, "fdc.sqlite3")
+        start = time.perf_counter()
+        count = import_fdc([source], db_path)
+        print(f"import: {time.perf_counter() - start:.1f} s for {count} foods, "
+              f"{os.path.getsize(db_path) / 1e6:.1f} MB")
+
+        store = FDCStore(db_path)
+        if descriptions is None:
+            descriptions = [row[0] for row in store._connect().execute("SELECT description FROM foods LIMIT 10000")]
+        exact = [rng.choice(descriptions) for _ in range(args.lookups)]
+        words = [" ".join(rng.sample(WORDS, 2)) for _ in range(args.lookups)]
+
+        print(f"exact lookup: {time_lookups(store, exact)}")
+        print(f"word lookup: {time_lookups(store, words)}")
+
+if __name__ == "__main__":
+    main()
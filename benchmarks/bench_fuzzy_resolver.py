@@ -0,0 +1,124 @@
+"""
+Fuzzy medication resolver benchmark
+
+Builds the trigram resolver over a synthetic drug vocabulary (or a real one
+with --vocabulary, one name per line), then resolves misspelled names and
+reports build time and per-lookup latency. With --verify, every result is
+checked against a brute-force scan of the whole vocabulary.
+
+Also checks rag_engine.extract_medications: misspelled drugs in
+prescription phrasing must resolve, and ordinary prose (with words one edit
+from a drug, such as "aspiring" or "singular") must yield no medications.
+
+Usage:
+    python benchmarks/bench_fuzzy_resolver.py [--names 20000] [--lookups 5000] [--verify]
+"""
+import os
+import sys
+import time
+import random
+import string
+import argparse
+import statistics
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from fuzzy_matcher import FuzzyResolver  # noqa: E402
+from rag_engine import extract_medications  # noqa: E402
+
+SUFFIXES = ["statin", "pril", "sartan", "olol", "azole", "cillin", "mycin", "dipine", "tidine", "zepam"]
+
+# Text -> medications extract_medications must find in it
+EXTRACTION_CASES = [
+    ("Patient was prescribed warfarn 5 mg daily.", {"warfarin"}),
+    ("Take atorvastatn 20 mg at night.", {"atorvastatin"}),
+    ("Continue lisinopril 10mg once a day.", {"lisinopril"}),
+    ("She is aspiring to run a marathon and keeps a singular focus.", set()),
+    ("The compressor in the kitchen broke, so the milk went sour.", set()),
+    ("Regular exercise and a balanced diet were discussed at the visit.", set()),
+]
+
+def check_extraction():
+    """Run the extraction cases; returns the number of failures"""
+    failures = 0
+    for text, expected in EXTRACTION_CASES:
+        found = set(extract_medications(text.lower()))
+        if found != expected:
+            failures += 1
+            print(f"MISMATCH {text!r}: expected {sorted(expected)}, got {sorted(found)}")
+    print(f"extraction: {failures} failures in {len(EXTRACTION_CASES)} cases")
+    return failures
+
+def synthetic_vocabulary(n_names, rng):
+    """Drug-like names: random stems with common pharmacological suffixes"""
+    names = set()
+    while len(names) < n_names:
+        stem = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 7)))
+        names.add(stem + rng.choice(SUFFIXES))
+    return sorted(names)
+
+def misspell(name, rng):
+    """Apply one random OCR-like edit (drop, swap or substitute a character)"""
+    i = rng.randrange(len(name))
+    edit = rng.choice(["drop", "substitute", "insert"])
+    if edit == "drop":
+        return name[:i] + name[i + 1:]
+    if edit == "insert":
+        return name[:i] + rng.choice(string.ascii_lowercase) + name[i:]
+    return name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1:]
+
+def brute_force(resolver, token):
+    """Reference answer: best distance over the entire vocabulary"""
+    limit = resolver.max_distance(token)
+    distances = [(resolver._edit_distance(token, name, limit), name) for name in resolver.names]
+    best = min(distances)[0]
+    return best if best <= limit else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fuzzy medication name resolution")
+    parser.add_argument("--names", type=int, default=20000, help="synthetic vocabulary size")
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--vocabulary", help="file with one medication name per line")
+    parser.add_argument("--verify", action="store_true", help="check results against brute force")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    if args.vocabulary:
+        with open(args.vocabulary) as f:
+            vocabulary = [line.strip().lower() for line in f if line.strip()]
+    else:
+        vocabulary = synthetic_vocabulary(args.names, rng)
+
+    start = time.perf_counter()
+    resolver = FuzzyResolver(vocabulary)
+    print(f"build: {(time.perf_counter() - start) * 1000:.0f} ms for {len(resolver.names)} names")
+
+    queries = [misspell(rng.choice(vocabulary), rng) for _ in range(args.lookups)]
+    timings = []
+    resolved = 0
+    for query in queries:
+        start = time.perf_counter()
+        result = resolver.resolve(query)
+        timings.append((time.perf_counter() - start) * 1000)
+        resolved += result is not None
+
+    timings.sort()
+    print(f"resolve: p50 {statistics.median(timings):.3f} ms, p95 {timings[int(0.95 * len(timings))]:.3f} ms, "
+          f"resolved {resolved}/{len(queries)}")
+
+    failures = check_extraction()
+
+    if args.verify:
+        mismatches = 0
+        for query in queries[:500]:
+            result = resolver.resolve(query)
+            expected = brute_force(resolver, query)
+            got = None if result is None else resolver._edit_distance(query, result, resolver.max_distance(query))
+            mismatches += got != expected
+        print(f"verify: {mismatches} mismatches in {min(500, len(queries))} lookups")
+        failures += mismatches
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
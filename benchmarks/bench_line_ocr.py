@@ -0,0 +1,78 @@
+"""
+Line-segmentation and batched TrOCR benchmark
+
+Renders the sample prescriptions in Test_Prescriptions/, splits every page
+into text lines and recognizes them at several batch sizes, reporting
+lines/sec for each. The single whole-page generate call the app used to make
+is timed as a baseline.
+
+Usage:
+    python benchmarks/bench_line_ocr.py [--batch-sizes 1,2,4,8,16] [--dpi 150]
+
+Requires torch, transformers, pdf2image and poppler.
+"""
+import os
+import sys
+import time
+import glob
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from model_registry import get_trocr  # noqa: E402
+from line_segmenter import segment_lines  # noqa: E402
+from text_extractor import recognize_lines  # noqa: E402
+
+def load_pages(dpi):
+    """Renders every sample prescription page to a PIL image"""
+    from pdf2image import convert_from_path
+
+    pages = []
+    for pdf_path in sorted(glob.glob(os.path.join(REPO_ROOT, "Test_Prescriptions", "*.pdf"))):
+        pages.extend(convert_from_path(pdf_path, dpi=dpi))
+    return pages
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark line segmentation and batched TrOCR")
+    parser.add_argument("--batch-sizes", default="1,2,4,8,16", help="comma-separated batch sizes")
+    parser.add_argument("--dpi", type=int, default=150, help="resolution used to render the PDFs")
+    args = parser.parse_args()
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+
+    start = time.perf_counter()
+    get_trocr()
+    print(f"model load: {time.perf_counter() - start:.2f} s")
+
+    pages = load_pages(args.dpi)
+    print(f"pages: {len(pages)}")
+
+    start = time.perf_counter()
+    lines = [line for page in pages for line in segment_lines(page)]
+    segment_seconds = time.perf_counter() - start
+    print(f"segmentation: {len(lines)} lines in {segment_seconds * 1000:.1f} ms "
+          f"({segment_seconds * 1000 / max(len(pages), 1):.1f} ms/page)")
+
+    # Baseline: the whole page as a single TrOCR input
+    start = time.perf_counter()
+    for page in pages:
+        recognize_lines([page], batch_size=1)
+    baseline_seconds = time.perf_counter() - start
+    print(f"whole-page baseline: {baseline_seconds:.2f} s "
+          f"({baseline_seconds / max(len(pages), 1):.2f} s/page, 1 line of output per page)")
+
+    # Warm up kernels once so the first batch size is not penalized
+    recognize_lines(lines[:1], batch_size=1)
+
+    print(f"{'batch':>6} {'seconds':>9} {'lines/s':>9} {'speedup':>8}")
+    reference = None
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        recognize_lines(lines, batch_size=batch_size)
+        seconds = time.perf_counter() - start
+        rate = len(lines) / seconds if seconds else float("inf")
+        reference = reference or rate
+        print(f"{batch_size:>6} {seconds:>9.2f} {rate:>9.2f} {rate / reference:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Restriction index parity check and benchmark
+
+Checks RestrictionIndex against the original nested-loop food safety scan
+over the whole restriction vocabulary (every condition restriction,
+medication-interacting food and allergy in the knowledge base): every
+ingredient that the scan flags must still be flagged, with the same
+explanations. Probes include each term, compound words built around it
+("buttermilk", "catfish", "monosodium glutamate") and its sub-words.
+Then times both on random ingredient lists.
+
+Usage:
+    python benchmarks/bench_restriction_index.py [--foods 2000] [--ingredients 12]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from models import FoodSafetyKnowledge  # noqa: E402
+from rag_engine import build_restriction_index, check_food_safety, get_risky_foods  # noqa: E402
+
+AFFIXES = ["butter", "cat", "mono", "sweet ", "low-", "raw "]
+SUFFIXES = ["milk", "fish", " glutamate", " oil", "s", " extract", "-free"]
+
+def full_profile():
+    """A restriction profile with every medication, condition restriction and allergy"""
+    restrictions = []
+    for foods in FoodSafetyKnowledge.CONDITIONS.values():
+        restrictions.extend(foods)
+    return {
+        "medications": list(FoodSafetyKnowledge.INTERACTIONS),
+        "conditions": list(FoodSafetyKnowledge.CONDITIONS),
+        "allergies": list(FoodSafetyKnowledge.ALLERGIES),
+        "restrictions": list(dict.fromkeys(restrictions + FoodSafetyKnowledge.ALLERGIES)),
+    }
+
+def baseline_explanations(food_name, ingredients, restrictions):
+    """The original check_food_safety scan, returning its explanations"""
+    explanation = []
+    if food_name.lower() in [r.lower() for r in restrictions.get("restrictions", [])]:
+        explanation.append(f"{food_name} is directly listed in your restrictions.")
+    for ingredient in ingredients:
+        for restriction in restrictions.get("restrictions", []):
+            if restriction.lower() in ingredient.lower() or ingredient.lower() in restriction.lower():
+                explanation.append(f"{ingredient} may interact with your health condition or medication.")
+    for medication in restrictions.get("medications", []):
+        for risky_food in get_risky_foods(medication):
+            if risky_food.lower() in food_name.lower() or any(risky_food.lower() in i.lower() for i in ingredients):
+                explanation.append(f"{risky_food} may interact with your medication {medication}.")
+    for allergy in restrictions.get("allergies", []):
+        if allergy.lower() in food_name.lower() or any(allergy.lower() in i.lower() for i in ingredients):
+            explanation.append(f"{allergy} is listed in your allergies.")
+    return set(explanation)
+
+def probes(restrictions):
+    """Each vocabulary term, compounds built around it and its sub-words"""
+    terms = set(restrictions["restrictions"]) | set(restrictions["allergies"])
+    for medication in restrictions["medications"]:
+        terms.update(get_risky_foods(medication))
+    found = set()
+    for term in terms:
+        found.add(term)
+        found.update(affix + term for affix in AFFIXES)
+        found.update(term + suffix for suffix in SUFFIXES)
+        found.update(term.replace("-", " ").split())
+    return sorted(found)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the restriction index")
+    parser.add_argument("--foods", type=int, default=2000, help="random foods to time")
+    parser.add_argument("--ingredients", type=int, default=12, help="ingredients per random food")
+    args = parser.parse_args()
+
+    restrictions = full_profile()
+    index = build_restriction_index(restrictions)
+    names = probes(restrictions)
+
+    missing = 0
+    for name in names:
+        # As a food name, and as the only ingredient of a neutral food
+        for food_name, ingredients in ((name, []), ("dish", [name])):
+            expected = baseline_explanations(food_name, ingredients, restrictions)
+            result = check_food_safety(food_name, {"ingredients": ingredients}, restrictions, index)
+            lost = expected - set(result["explanation"])
+            if lost or (expected and result["is_safe"]):
+                missing += 1
+                print(f"MISMATCH {food_name!r} {ingredients}: lost {sorted(lost)}")
+    print(f"{len(names)} probes: {missing} with matches lost against the baseline")
+
+    rng = random.Random(0)
+    foods = [rng.sample(names, args.ingredients) for _ in range(args.foods)]
+    start = time.perf_counter()
+    for ingredients in foods:
+        baseline_explanations("dish", ingredients, restrictions)
+    old_ms = (time.perf_counter() - start) * 1000 / args.foods
+    start = time.perf_counter()
+    for ingredients in foods:
+        check_food_safety("dish", {"ingredients": ingredients}, restrictions, index)
+    new_ms = (time.perf_counter() - start) * 1000 / args.foods
+    print(f"per food: baseline {old_ms:.3f} ms, index {new_ms:.3f} ms")
+    sys.exit(1 if missing else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Interaction retrieval benchmark
+
+Builds a BM25 index over a synthetic drug-food interaction corpus (or a real
+one with --corpus) and reports build time and query latency percentiles for
+"which foods interact with drugs X, Y" lookups, separately for each kind of
+drug name:
+
+- exact: names as in the corpus, answered from the drug -> foods map;
+- salted: a corpus name with extra words ("drug12 sodium tablets");
+- misspelled: a corpus name with one character edit;
+- free text: a sentence naming the drug among common corpus words.
+
+Only exact names skip BM25, so the other kinds show its cost.
+
+Usage:
+    python benchmarks/bench_retrieval.py [--passages 100000] [--queries 1000] [--corpus PATH]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from retrieval import BM25Index, load_corpus  # noqa: E402
+
+FILLER = (
+    "may increase or decrease absorption levels metabolism enzyme effect risk bleeding "
+    "potassium sodium vitamin blood pressure sugar liver kidney dose timing meal"
+).split()
+
+def synthetic_corpus(n_passages, n_drugs=5000, n_foods=2000, seed=0):
+    """Generates interaction passages with a realistic vocabulary size"""
+    rng = random.Random(seed)
+    drugs = [f"drug{i}" for i in range(n_drugs)]
+    foods = [f"food{i}" for i in range(n_foods)]
+    passages = []
+    for _ in range(n_passages):
+        drug, food = rng.choice(drugs), rng.choice(foods)
+        words = [drug, food] + rng.choices(FILLER, k=rng.randint(15, 40))
+        rng.shuffle(words)
+        passages.append({"drug": drug, "food": food, "text": " ".join(words)})
+    return passages, drugs
+
+SALTS = ["sodium", "hydrochloride", "potassium", "calcium", "extended release"]
+
+def misspell(name, rng):
+    """Swap two adjacent characters, or drop one, as OCR and typing do"""
+    i = rng.randrange(len(name) - 1)
+    if rng.random() < 0.5:
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    return name[:i] + name[i + 1:]
+
+QUERY_KINDS = {
+    "exact": lambda drug, rng: drug,
+    "salted": lambda drug, rng: f"{drug} {rng.choice(SALTS)} tablets",
+    "misspelled": misspell,
+    "free text": lambda drug, rng: (f"which foods raise the bleeding risk or change blood sugar "
+                                    f"levels with {drug} at meal timing"),
+}
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BM25 interaction retrieval")
+    parser.add_argument("--passages", type=int, default=100000, help="synthetic corpus size")
+    parser.add_argument("--queries", type=int, default=1000, help="number of timed queries")
+    parser.add_argument("--drugs-per-query", type=int, default=2)
+    parser.add_argument("--corpus", help="benchmark a real corpus directory or file instead")
+    args = parser.parse_args()
+
+    if args.corpus:
+        passages = load_corpus(args.corpus)
+        drugs = sorted({p["drug"] for p in passages if p["drug"]})
+    else:
+        passages, drugs = synthetic_corpus(args.passages)
+    print(f"passages: {len(passages)}")
+
+    start = time.perf_counter()
+    index = BM25Index(passages)
+    print(f"build: {time.perf_counter() - start:.2f} s, {len(index.vocabulary)} terms")
+
+    for kind, make_name in QUERY_KINDS.items():
+        rng = random.Random(1)
+        timings = []
+        found = 0
+        for _ in range(args.queries):
+            query_drugs = [make_name(drug, rng)
+                           for drug in rng.sample(drugs, min(args.drugs_per_query, len(drugs)))]
+            start = time.perf_counter()
+            result = index.interacting_foods(query_drugs)
+            timings.append((time.perf_counter() - start) * 1000)
+            found += sum(len(foods) for foods in result.values())
+
+        print(f"{kind:>10}: interacting_foods({args.drugs_per_query} drugs) "
+              f"p50 {statistics.median(timings):.2f} ms, p95 {percentile(timings, 0.95):.2f} ms, "
+              f"max {max(timings):.2f} ms, {found / len(timings):.1f} foods per query")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Startup-time benchmark for the web app
+
+Measures how long a fresh interpreter takes to `import app` (what every
+gunicorn worker and every `python main.py` restart pays) and checks that the
+heavy OCR libraries are not imported on that path.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--max-seconds 1.0]
+
+Exits with status 1 if the median import time exceeds --max-seconds or if
+torch/transformers/trafilatura are imported by `import app`.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy modules that must stay off the import path
+HEAVY_MODULES = ["torch", "transformers", "trafilatura"]
+
+# Child process: time the import and report which heavy modules got loaded
+CHILD_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+def time_import():
+    """Runs `import app` in a fresh interpreter and returns its report"""
+    env = dict(os.environ, MODEL_WARMUP="0")
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    # The report is the last line; anything before it is app logging
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark `import app` startup time")
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh interpreters to time")
+    parser.add_argument("--max-seconds", type=float, default=1.0, help="fail if the median exceeds this")
+    args = parser.parse_args()
+
+    reports = [time_import() for _ in range(args.runs)]
+    timings = [r["seconds"] for r in reports]
+    loaded = sorted({m for r in reports for m in r["loaded"]})
+    median = statistics.median(timings)
+
+    print(f"import app: median {median * 1000:.1f} ms, "
+          f"min {min(timings) * 1000:.1f} ms, max {max(timings) * 1000:.1f} ms over {args.runs} runs")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(loaded)}")
+        failed = True
+    if median > args.max_seconds:
+        print(f"FAIL: median import time exceeds {args.max_seconds:.2f} s")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
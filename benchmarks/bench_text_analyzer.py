@@ -0,0 +1,101 @@
+"""
+Article text analysis benchmark
+
+Compares the single-pass TextAnalyzer with the previous approach (eleven
+separate IGNORECASE regex passes plus a lowercase scan per ingredient) on
+synthetic encyclopedia-style article text, and checks that both find the
+same ingredients, benefits and risks.
+
+Usage:
+    python benchmarks/bench_text_analyzer.py [--kilobytes 200] [--repeat 20] [--text FILE]
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import statistics
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from text_analyzer import (  # noqa: E402
+    BENEFIT_PATTERNS, COMMON_INGREDIENTS, INGREDIENT_PATTERNS, RISK_PATTERNS, TextAnalyzer,
+)
+
+SENTENCES = [
+    "The banana is an elongated, edible fruit produced by several kinds of large herbaceous flowering plants",
+    "Bananas are rich in potassium and a good source of vitamin B6",
+    "Cultivation of the plant spread from Southeast Asia to Africa and later to the Americas",
+    "In popular culture the fruit appears in many works of art and comedy",
+    "Consumption of unripe fruit may cause digestive discomfort in some people",
+    "People with latex allergy have a higher risk of reacting to the fruit",
+    "The peel contains: water, cellulose, pectin, and sugars",
+    "Exports are an important part of the economy of several countries",
+    "Diets high in fiber can help reduce the risk of heart disease",
+    "Dessert varieties are usually eaten raw, while cooking varieties are boiled or fried",
+]
+
+def synthetic_article(kilobytes, rng):
+    """Random sentences, grouped into paragraphs, of roughly the given size"""
+    paragraphs, size = [], 0
+    while size < kilobytes * 1024:
+        paragraph = ". ".join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 8))) + "."
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+def baseline(text):
+    """The previous per-pattern extraction, as sets (the old code returned set order)"""
+    found = {"ingredients": set(), "benefits": set(), "risks": set()}
+    for kind, patterns in (("ingredients", INGREDIENT_PATTERNS), ("benefits", BENEFIT_PATTERNS),
+                           ("risks", RISK_PATTERNS)):
+        for _, pattern in patterns:
+            for match in re.findall(pattern, text, re.IGNORECASE):
+                if kind == "ingredients":
+                    found[kind].update(item.strip().lower() for item in match.split(','))
+                    continue
+                phrase = match.strip()
+                if 5 < len(phrase) < 100:
+                    found[kind].add(f"May {phrase}" if not phrase.lower().startswith(
+                        ('be ', 'is ', 'are ', 'may ', 'can ')) else phrase)
+    if not found["ingredients"]:
+        found["ingredients"] = {ingredient for ingredient in COMMON_INGREDIENTS if ingredient in text.lower()}
+    return found
+
+def time_call(function, text, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single-pass article text analysis")
+    parser.add_argument("--kilobytes", type=int, default=200, help="synthetic article size")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--text", help="analyze a real article text file instead")
+    args = parser.parse_args()
+
+    if args.text:
+        with open(args.text, encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = synthetic_article(args.kilobytes, random.Random(0))
+    print(f"text: {len(text) / 1024:.0f} KB")
+
+    analyzer = TextAnalyzer()
+    result = analyzer.analyze(text)
+    expected = baseline(text)
+    mismatches = [kind for kind in expected if set(result[kind]) != expected[kind]]
+    print(f"results match baseline: {'yes' if not mismatches else 'NO (' + ', '.join(mismatches) + ')'}")
+
+    old_ms = time_call(baseline, text, args.repeat)
+    new_ms = time_call(analyzer.analyze, text, args.repeat)
+    print(f"baseline: {old_ms:.1f} ms, single pass: {new_ms:.1f} ms, speedup {old_ms / new_ms:.1f}x")
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
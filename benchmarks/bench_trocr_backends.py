@@ -0,0 +1,203 @@
+"""
+TrOCR inference backend benchmark with an accuracy gate
+
+Loads each backend (fp32, int8, onnx) in its own fresh process, recognizes
+the line crops of the sample prescriptions in Test_Prescriptions/ and reports
+load time, per-line latency, resident memory and character error rate (CER)
+against the fp32 output, or against reference transcripts if --reference is
+given (a text file with one expected line per crop).
+
+Backends whose libraries are not installed (e.g. onnx without
+optimum[onnxruntime]) are skipped with a message. For onnx, the model is
+loaded a second time to check that the saved export in TROCR_ONNX_DIR is
+reused rather than exported again.
+
+Usage:
+    python benchmarks/bench_trocr_backends.py [--backends fp32,int8,onnx] [--max-cer 0.05]
+
+Exits with status 1 if a backend that could run failed, exceeded --max-cer
+or re-exported the ONNX model.
+"""
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import importlib.util
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Modules each backend needs
+BACKEND_MODULES = {
+    "fp32": ("torch", "transformers"),
+    "int8": ("torch", "transformers"),
+    "onnx": ("transformers", "optimum", "onnxruntime"),
+}
+
+def missing_modules(backend):
+    """Returns the modules a backend needs that are not installed"""
+    return [name for name in BACKEND_MODULES.get(backend, ()) if importlib.util.find_spec(name) is None]
+
+def export_signature(path):
+    """(inode, mtime) of every file of an export directory, to tell whether it was rewritten"""
+    signature = {}
+    for root, _, files in os.walk(path):
+        for name in files:
+            stat = os.stat(os.path.join(root, name))
+            signature[os.path.relpath(os.path.join(root, name), path)] = (stat.st_ino, stat.st_mtime_ns)
+    return signature
+
+def current_rss_mb():
+    """Returns the resident set size of this process in MB (Linux)"""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
+
+def load_lines(dpi):
+    """Renders the sample prescriptions and splits them into line crops"""
+    from pdf2image import convert_from_path
+    from line_segmenter import segment_lines
+
+    lines = []
+    for pdf_path in sorted(glob.glob(os.path.join(REPO_ROOT, "Test_Prescriptions", "*.pdf"))):
+        for page in convert_from_path(pdf_path, dpi=dpi):
+            lines.extend(segment_lines(page))
+    return lines
+
+def run_backend(backend, dpi, batch_size):
+    """Child process: benchmark one backend and print a JSON report"""
+    from model_registry import load_trocr, load_onnx_model, onnx_export_dir
+    from text_extractor import recognize_lines
+
+    lines = load_lines(dpi)
+    rss_before = current_rss_mb()
+
+    start = time.perf_counter()
+    trocr = load_trocr(backend)
+    load_seconds = time.perf_counter() - start
+
+    export = None
+    if backend == "onnx":
+        # A second load must use the saved export, not export again
+        signature = export_signature(onnx_export_dir())
+        start = time.perf_counter()
+        load_onnx_model()
+        export = {
+            "reload_seconds": time.perf_counter() - start,
+            "reused": bool(signature) and export_signature(onnx_export_dir()) == signature,
+        }
+
+    # Warm-up so one-time kernel initialization is not counted
+    recognize_lines(lines[:1], batch_size=1, trocr=trocr)
+
+    start = time.perf_counter()
+    texts = recognize_lines(lines, batch_size=batch_size, trocr=trocr)
+    seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "lines": len(lines),
+        "seconds": seconds,
+        "rss_mb": current_rss_mb() - rss_before,
+        "export": export,
+        "texts": texts,
+    }))
+
+def levenshtein(a, b):
+    """Edit distance between two strings"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+def character_error_rate(hypotheses, references):
+    """Total edit distance divided by the total reference length"""
+    errors = sum(levenshtein(h, r) for h, r in zip(hypotheses, references))
+    total = sum(len(r) for r in references)
+    return errors / total if total else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare TrOCR inference backends")
+    parser.add_argument("--backends", default="fp32,int8,onnx", help="comma-separated backends")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--reference", help="file with the expected text, one line per crop")
+    parser.add_argument("--max-cer", type=float, default=0.05, help="fail if a backend's CER exceeds this")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_backend(args.child, args.dpi, args.batch_size)
+        return
+
+    backends = args.backends.split(",")
+    if not args.reference and "fp32" not in backends:
+        backends.insert(0, "fp32")
+
+    runnable = []
+    for backend in backends:
+        missing = missing_modules(backend)
+        if missing:
+            print(f"{backend}: skipped, {', '.join(missing)} not installed")
+        else:
+            runnable.append(backend)
+    if not runnable:
+        print("No backend can run here; nothing to benchmark")
+        return
+
+    reports = {}
+    for backend in runnable:
+        # Each backend runs in a fresh interpreter so RSS numbers are not polluted
+        result = subprocess.run(
+            [sys.executable, __file__, "--child", backend,
+             "--dpi", str(args.dpi), "--batch-size", str(args.batch_size)],
+            cwd=REPO_ROOT,
+            env=dict(os.environ, MODEL_WARMUP="0"),
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            print(f"{backend}: failed\n{result.stderr.strip().splitlines()[-1] if result.stderr else ''}")
+            continue
+        reports[backend] = json.loads(result.stdout.strip().splitlines()[-1])
+
+    if args.reference:
+        with open(args.reference) as f:
+            references = f.read().splitlines()
+    elif "fp32" in reports:
+        references = reports["fp32"]["texts"]
+    else:
+        print("FAIL: no reference available (fp32 did not run and no --reference given)")
+        sys.exit(1)
+
+    print(f"{'backend':>8} {'load s':>8} {'ms/line':>9} {'RSS MB':>8} {'CER':>7}")
+    failed = False
+    for backend, report in reports.items():
+        cer = character_error_rate(report["texts"], references)
+        ms_per_line = report["seconds"] * 1000 / max(report["lines"], 1)
+        print(f"{backend:>8} {report['load_seconds']:>8.2f} {ms_per_line:>9.1f} "
+              f"{report['rss_mb']:>8.0f} {cer:>7.3f}")
+        if cer > args.max_cer:
+            print(f"FAIL: {backend} CER {cer:.3f} exceeds {args.max_cer:.3f}")
+            failed = True
+        export = report.get("export")
+        if export is not None:
+            print(f"{backend:>8} second load {export['reload_seconds']:.2f} s, "
+                  f"export {'reused' if export['reused'] else 'REWRITTEN'}")
+            if not export["reused"]:
+                print(f"FAIL: {backend} exported the model again instead of loading the saved export")
+                failed = True
+
+    sys.exit(1 if failed or len(reports) < len(runnable) else 0)
+
+if __name__ == "__main__":
+    main()
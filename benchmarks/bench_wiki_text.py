@@ -0,0 +1,87 @@
+"""
+Wikipedia section extraction benchmark
+
+Measures the CPU time of extracting the lead plus the nutrition, health and
+ingredient sections of an article, against parsing every section (and
+against a full trafilatura.extract when trafilatura is installed), on a
+synthetic article or on a saved article HTML file.
+
+Usage:
+    python benchmarks/bench_wiki_text.py [--sections 40] [--repeat 20] [--html FILE]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from wiki_text import WIKIPEDIA_SECTION_KEYWORDS, extract_sections  # noqa: E402
+
+HEADINGS = ["Etymology", "History", "Cultivation", "Production", "Trade", "Culinary uses", "Culture",
+            "Pests", "Varieties", "Storage"]
+# About one section in ten is one we keep, as in real food articles
+RELEVANT_HEADINGS = ["Nutrition", "Health effects", "Ingredients", "Allergies"]
+
+SENTENCE = ("The <a href=\"/wiki/Plant\">plant</a> is grown in tropical regions and eaten raw or cooked"
+            "<sup class=\"reference\">[<a href=\"#cite\">1</a>]</sup>. ")
+
+def synthetic_article(sections, rng):
+    """Article HTML in current MediaWiki markup, with an infobox, a lead and numbered sections"""
+    parts = ["<html><body><nav><ul><li>Main page</li></ul></nav><div id=\"mw-content-text\">",
+             "<table class=\"infobox\"><tr><td>Energy 371 kJ</td></tr></table>",
+             "<p>" + SENTENCE * 6 + "</p>"]
+    for number in range(sections):
+        heading = f"{rng.choice(RELEVANT_HEADINGS if rng.random() < 0.1 else HEADINGS)} {number}"
+        parts.append(f"<div class=\"mw-heading mw-heading2\"><h2 id=\"s{number}\">{heading}</h2></div>")
+        for _ in range(rng.randint(2, 6)):
+            parts.append("<p>" + SENTENCE * rng.randint(3, 10) + "</p>")
+        parts.append("<ul>" + "<li>Item</li>" * rng.randint(0, 8) + "</ul>")
+    parts.append("</div></body></html>")
+    return "".join(parts)
+
+def time_call(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.thread_time()
+        function()
+        timings.append((time.thread_time() - start) * 1000)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Wikipedia section extraction")
+    parser.add_argument("--sections", type=int, default=40, help="sections of the synthetic article")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--html", help="use a saved article HTML file instead")
+    args = parser.parse_args()
+
+    if args.html:
+        with open(args.html, encoding="utf-8") as f:
+            html = f.read()
+    else:
+        html = synthetic_article(args.sections, random.Random(0))
+    print(f"html: {len(html.encode()) / 1024:.0f} KB")
+
+    text, headings = extract_sections(html)
+    full_text, _ = extract_sections(html, keywords=("",))
+    print(f"kept sections: {headings}")
+    print(f"text: {len(text)} chars kept of {len(full_text)}")
+
+    section_ms = time_call(lambda: extract_sections(html), args.repeat)
+    full_ms = time_call(lambda: extract_sections(html, keywords=("",)), args.repeat)
+    print(f"all sections: {full_ms:.1f} ms CPU, lead + {'/'.join(WIKIPEDIA_SECTION_KEYWORDS[:4])}...: "
+          f"{section_ms:.1f} ms CPU ({full_ms / section_ms:.1f}x)")
+
+    try:
+        import trafilatura
+    except ImportError:
+        print("trafilatura not installed; skipping the full-extract comparison")
+        return
+    trafilatura_ms = time_call(lambda: trafilatura.extract(html), args.repeat)
+    print(f"trafilatura.extract: {trafilatura_ms:.1f} ms CPU ({trafilatura_ms / section_ms:.1f}x)")
+
+if __name__ == "__main__":
+    main()
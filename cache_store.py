@@ -0,0 +1,408 @@
+import os
+import copy
+import json
+import time
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Reads record access times in memory; they are written to the file in one
+# batch once this many are pending or the oldest is this many seconds old
+ACCESS_FLUSH_SIZE = 64
+ACCESS_FLUSH_INTERVAL = 5.0
+
+# Entries deleted per eviction query
+EVICT_BATCH = 64
+
+class SQLiteCache:
+    """
+    Persistent key/value cache stored in a local SQLite file
+
+    Entries are evicted least-recently-used first once the total size of the
+    stored values exceeds max_bytes. The total size and entry count are kept
+    in a meta table by triggers, so a write never scans the entries. Reads do
+    not write: access times are batched in memory and flushed every
+    ACCESS_FLUSH_SIZE reads or ACCESS_FLUSH_INTERVAL seconds (and before
+    evicting), so the LRU order lags by at most that much. The file can be
+    shared by several worker processes; hit/miss counters are kept per process.
+
+    Cache errors are logged and treated as misses, so a broken or locked cache
+    file never breaks the request that uses it.
+    """
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._accessed = {}  # key -> last access time not yet written
+        self._accessed_since = None
+        self._access_lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+            # Running totals; files created before the meta table are counted once here
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('bytes', (SELECT COALESCE(SUM(size), 0) FROM entries))")
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('entries', (SELECT COUNT(*) FROM entries))")
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN"
+                " UPDATE meta SET value = value + NEW.size WHERE name = 'bytes';"
+                " UPDATE meta SET value = value + 1 WHERE name = 'entries'; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN"
+                " UPDATE meta SET value = value - OLD.size WHERE name = 'bytes';"
+                " UPDATE meta SET value = value - 1 WHERE name = 'entries'; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN"
+                " UPDATE meta SET value = value + NEW.size - OLD.size WHERE name = 'bytes'; END"
+            )
+
+    def _connect(self):
+        """Returns this thread's connection (sqlite3 connections are not shared across threads)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Transactions are managed explicitly (BEGIN IMMEDIATE for writes)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        """
+        Look up a cached value
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            str: The cached value, or None on a miss
+        """
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """
+        Look up a cached value together with its age
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            tuple: (value, age in seconds), or None on a miss
+        """
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count(False)
+                return None
+            now = time.time()
+            self._touch(key, now)
+            self._count(True)
+            return row[0], now - row[1]
+        except sqlite3.Error as e:
+            logger.error(f"Cache read failed ({self.path}): {str(e)}")
+            self._count(False)
+            return None
+
+    def _touch(self, key, now):
+        """Record a read; the access times are written in batches"""
+        with self._access_lock:
+            self._accessed[key] = now
+            if self._accessed_since is None:
+                self._accessed_since = now
+            due = (len(self._accessed) >= ACCESS_FLUSH_SIZE
+                   or now - self._accessed_since >= ACCESS_FLUSH_INTERVAL)
+        if due:
+            try:
+                conn = self._connect()
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    self._flush_accesses(conn)
+            except sqlite3.Error as e:
+                logger.error(f"Cache access-time update failed ({self.path}): {str(e)}")
+
+    def _flush_accesses(self, conn):
+        """Write the pending access times (inside the caller's transaction)"""
+        with self._access_lock:
+            accessed, self._accessed, self._accessed_since = self._accessed, {}, None
+        if accessed:
+            conn.executemany(
+                "UPDATE entries SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                [(when, key) for key, when in accessed.items()],
+            )
+
+    def set(self, key, value):
+        """
+        Store a value, evicting least-recently-used entries if the cache is over budget
+
+        Args:
+            key (str): Cache key
+            value (str): Value to store
+        """
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    "INSERT INTO entries (key, value, size, created_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size,"
+                    " created_at = excluded.created_at, accessed_at = excluded.accessed_at",
+                    (key, value, size, now, now),
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.error(f"Cache write failed ({self.path}): {str(e)}")
+
+    def _evict(self, conn):
+        """Delete the least recently used entries until the cache fits in max_bytes"""
+        total = conn.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Evict by up-to-date access times
+        self._flush_accesses(conn)
+        evicted = 0
+        while total > self.max_bytes:
+            rows = conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT ?", (EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                victims.append((key,))
+                total -= size
+            conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+            evicted += len(victims)
+        logger.debug(f"Evicted {evicted} entries from {self.path}")
+
+    def stats(self):
+        """
+        Returns hit/miss counters and the current size of the cache
+
+        Returns:
+            dict: hits, misses, hit_rate, entries and bytes
+        """
+        entries, total = 0, 0
+        try:
+            totals = dict(self._connect().execute("SELECT name, value FROM meta").fetchall())
+            entries, total = totals["entries"], totals["bytes"]
+        except sqlite3.Error as e:
+            logger.error(f"Cache stats failed ({self.path}): {str(e)}")
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+class RevalidatingCache:
+    """
+    JSON value cache with a TTL and stale-while-revalidate refresh
+
+    Wraps a SQLiteCache and a loader function:
+    - fresh entries (younger than ttl) are returned as they are;
+    - stale entries (younger than stale_ttl) are returned immediately while
+      the loader refreshes them on a background thread;
+    - older entries and misses are loaded synchronously.
+
+    Results the is_negative predicate flags (e.g. "nothing found") are cached
+    for negative_ttl only, so a failed lookup is retried sooner but is not
+    repeated on every request.
+
+    Loads are single-flight: while a key is being loaded (for a miss or as a
+    background refresh), other callers that need it wait for that load
+    instead of calling the loader again, so a popular key going stale or
+    missing sends one request upstream, not one per caller.
+    """
+
+    def __init__(self, cache, loader, ttl, stale_ttl, negative_ttl, is_negative=None, refresh_workers=2):
+        """
+        Args:
+            cache (SQLiteCache): Backing store
+            loader (callable): Computes the value for a key on a miss
+            ttl (float): Seconds an entry is served without refreshing
+            stale_ttl (float): Seconds a stale entry may still be served while refreshing
+            negative_ttl (float): Seconds a negative result is served
+            is_negative (callable, optional): Flags values that count as negative results
+            refresh_workers (int): Background refresh threads
+        """
+        self.cache = cache
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.negative_ttl = negative_ttl
+        self.is_negative = is_negative or (lambda value: False)
+        self.counters = {"fresh": 0, "stale": 0, "negative": 0, "loads": 0, "coalesced": 0,
+                         "refreshes": 0, "refresh_errors": 0}
+        self._in_flight = {}  # key -> Future of the load running for it
+        self._lock = threading.Lock()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="cache-refresh")
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _load(self, key):
+        value = self.loader(key)
+        try:
+            self.cache.set(key, json.dumps(value))
+        except (TypeError, ValueError) as e:
+            logger.error(f"Value for {key} is not cacheable: {str(e)}")
+        return value
+
+    def _claim(self, key):
+        """
+        Returns the in-flight load of a key, registering a new one if there is none
+
+        Returns:
+            tuple: (Future of the load, whether the caller must run it with _run)
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future, False
+            future = self._in_flight[key] = Future()
+            return future, True
+
+    def _run(self, key, future):
+        """Load a key claimed with _claim and hand the outcome to the callers waiting on it"""
+        try:
+            value = self._load(key)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _load_once(self, key):
+        """Load a key, or wait for the load already running for it"""
+        future, claimed = self._claim(key)
+        if not claimed:
+            # Copied: the values are mutable and each caller may change its own
+            self._count("coalesced")
+            return copy.deepcopy(future.result())
+        self._count("loads")
+        return self._run(key, future)
+
+    def _refresh(self, key, future):
+        try:
+            self._run(key, future)
+            self._count("refreshes")
+        except Exception as e:
+            logger.error(f"Background refresh of {key} failed: {str(e)}")
+            self._count("refresh_errors")
+
+    def _schedule_refresh(self, key):
+        """Refresh a stale entry in the background, unless it is already being loaded"""
+        future, claimed = self._claim(key)
+        if claimed:
+            self._refresh_pool.submit(self._refresh, key, future)
+
+    def refresh(self, key):
+        """
+        Load a key now and store the result, whatever the state of its entry
+
+        Args:
+            key (str): Cache key (passed to the loader)
+
+        Returns:
+            The freshly loaded value (or that of a load already running for it)
+        """
+        return self._load_once(key)
+
+    def get(self, key):
+        """
+        Returns the value for a key, loading or refreshing it as needed
+
+        Args:
+            key (str): Cache key (passed to the loader)
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        entry = self.cache.get_entry(key)
+        if entry is not None:
+            raw, age = entry
+            try:
+                value = json.loads(raw)
+            except ValueError:
+                value, age = None, float("inf")
+            if value is not None:
+                if self.is_negative(value):
+                    if age < self.negative_ttl:
+                        self._count("negative")
+                        return value
+                elif age < self.ttl:
+                    self._count("fresh")
+                    return value
+                elif age < self.stale_ttl:
+                    self._count("stale")
+                    self._schedule_refresh(key)
+                    return value
+
+        return self._load_once(key)
+
+    def stats(self):
+        """
+        Returns lookup counters and the backing cache size
+
+        hit_rate counts fresh, stale and negative hits over all lookups;
+        coalesced counts lookups that waited for another caller's load.
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            loading = len(self._in_flight)
+        served = counters["fresh"] + counters["stale"] + counters["negative"]
+        lookups = served + counters["loads"] + counters["coalesced"]
+        stats = self.cache.stats()
+        stats.update(counters)
+        stats["hit_rate"] = round(served / lookups, 3) if lookups else 0.0
+        stats["loading"] = loading
+        return stats
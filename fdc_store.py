@@ -0,0 +1,415 @@
+"""
+Local USDA FoodData Central nutrient store
+
+Imports the published FoodData Central bulk downloads
+(https://fdc.nal.usda.gov/download-datasets) into a compact, indexed SQLite
+file, so nutrient lookups are local queries instead of web requests. Both
+formats are supported:
+- CSV: a directory with food.csv, food_nutrient.csv and (optionally)
+  food_category.csv and branded_food.csv;
+- JSON: the Foundation, SR Legacy, Survey (FNDDS) or Branded food files.
+
+Only the nutrients the app reports (NUTRIENTS) are kept, per 100 g. Files
+are streamed record by record and inserted in batches, so the multi-GB
+Branded Foods download imports in bounded memory.
+
+Usage:
+    python fdc_store.py import PATH [PATH ...] [--output data/fdc.sqlite3]
+"""
+import os
+import re
+import csv
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import tempfile
+import itertools
+import threading
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+FDC_DB_PATH = os.environ.get(
+    "FDC_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "fdc.sqlite3"),
+)
+
+# How often (seconds) lookups check whether a new import replaced the file
+FDC_RELOAD_INTERVAL = float(os.environ.get("FDC_RELOAD_INTERVAL", "2"))
+
+# FDC nutrient id -> key in the app's nutrients dict. Several ids map to the
+# same key (e.g. energy is reported differently across data types); the
+# first one present for a food wins.
+NUTRIENTS = {
+    1008: "calories", 2047: "calories", 2048: "calories",
+    1003: "protein",
+    1005: "carbs",
+    1004: "fat",
+    1079: "fiber",
+    2000: "sugar", 1063: "sugar",
+    1093: "sodium",
+    1092: "potassium",
+}
+
+# Preferred data types when several foods match a name (lower is better)
+DATA_TYPE_RANK = {
+    "foundation_food": 0,
+    "sr_legacy_food": 1,
+    "survey_fndds_food": 2,
+    "branded_food": 3,
+}
+
+# Rows inserted per transaction during an import
+IMPORT_BATCH_ROWS = 50000
+
+# Characters read at a time from FDC JSON files
+JSON_CHUNK_SIZE = 1024 * 1024
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+SCHEMA = """
+CREATE TABLE foods (
+    fdc_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    data_type TEXT NOT NULL,
+    data_rank INTEGER NOT NULL,
+    category TEXT,
+    ingredients TEXT
+);
+CREATE TABLE food_nutrients (
+    fdc_id INTEGER NOT NULL,
+    nutrient TEXT NOT NULL,
+    amount REAL NOT NULL,
+    PRIMARY KEY (fdc_id, nutrient)
+) WITHOUT ROWID;
+"""
+
+INDEXES = """
+CREATE INDEX foods_name ON foods (name, data_rank);
+CREATE VIRTUAL TABLE food_names USING fts5(name, content='foods', content_rowid='fdc_id', tokenize='porter');
+INSERT INTO food_names (rowid, name) SELECT fdc_id, name FROM foods;
+"""
+
+def normalize_name(text):
+    """Lowercase words of a food description, single-spaced"""
+    return " ".join(WORD_PATTERN.findall(text.lower()))
+
+def _data_type(value):
+    """FDC data type in snake case ("Foundation" / "foundation_food" -> "foundation_food")"""
+    value = re.sub(r"[^a-z]+", "_", (value or "").lower()).strip("_")
+    if value and not value.endswith("_food"):
+        value += "_food"
+    return value
+
+def _food_row(fdc_id, description, data_type, category=None, ingredients=None):
+    data_type = _data_type(data_type)
+    return (int(fdc_id), normalize_name(description), description, data_type,
+            DATA_TYPE_RANK.get(data_type, len(DATA_TYPE_RANK)), category or None, ingredients or None)
+
+def _nutrient_rows(entries):
+    """(fdc_id, nutrient id, amount) -> food_nutrients rows, keeping only NUTRIENTS"""
+    for fdc_id, nutrient_id, amount in entries:
+        key = NUTRIENTS.get(int(nutrient_id))
+        if key is not None and amount not in (None, ""):
+            yield int(fdc_id), key, round(float(amount), 3)
+
+INSERT_FOOD = "INSERT OR REPLACE INTO foods VALUES (?, ?, ?, ?, ?, ?, ?)"
+INSERT_NUTRIENT = "INSERT OR IGNORE INTO food_nutrients VALUES (?, ?, ?)"
+
+def _insert_batches(conn, sql, rows, batch_rows=IMPORT_BATCH_ROWS):
+    """Insert rows from an iterator, committing every batch_rows rows"""
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_rows))
+        if not batch:
+            return
+        with conn:
+            conn.executemany(sql, batch)
+
+def _import_csv(conn, directory):
+    """Import a CSV download directory (food.csv, food_nutrient.csv, ...)"""
+    def rows(name):
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            return
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+
+    # A few hundred categories; branded_food.csv (millions of rows) is staged
+    # in SQLite and joined there instead of being held in memory
+    categories = {row["id"]: row["description"] for row in rows("food_category.csv")}
+    conn.execute("CREATE TABLE branded_staging (fdc_id INTEGER PRIMARY KEY, category TEXT, ingredients TEXT)")
+    _insert_batches(conn, "INSERT OR REPLACE INTO branded_staging VALUES (?, ?, ?)", (
+        (int(row["fdc_id"]), row.get("branded_food_category") or None, row.get("ingredients") or None)
+        for row in rows("branded_food.csv")
+    ))
+
+    _insert_batches(conn, INSERT_FOOD, (
+        _food_row(row["fdc_id"], row["description"], row["data_type"], categories.get(row.get("food_category_id")))
+        for row in rows("food.csv")
+    ))
+    with conn:
+        conn.execute(
+            "UPDATE foods SET category = COALESCE(foods.category, branded_staging.category),"
+            " ingredients = branded_staging.ingredients"
+            " FROM branded_staging WHERE foods.fdc_id = branded_staging.fdc_id"
+        )
+        conn.execute("DROP TABLE branded_staging")
+
+    _insert_batches(conn, INSERT_NUTRIENT, _nutrient_rows(
+        (row["fdc_id"], row["nutrient_id"], row.get("amount")) for row in rows("food_nutrient.csv")
+    ))
+
+def iter_json_records(f, chunk_size=JSON_CHUNK_SIZE):
+    """
+    Stream the objects of the first JSON array in a file, one at a time
+
+    FDC JSON downloads are one object holding one large array of foods
+    ({"BrandedFoods": [...]}), or a bare array. Only the current chunk and
+    the record being decoded are in memory.
+
+    Args:
+        f (file): Text file
+        chunk_size (int): Characters read at a time
+
+    Yields:
+        dict: One array element at a time
+    """
+    decoder = json.JSONDecoder()
+    buffer, position = "", -1
+    while position < 0:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        buffer += chunk
+        position = buffer.find("[")
+    position += 1
+
+    eof = False
+    while True:
+        # Skip separators; stop at the end of the array
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            chunk = f.read(chunk_size)
+            buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+        if position >= len(buffer) or buffer[position] == "]":
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The record continues in the next chunk
+            chunk = f.read(chunk_size)
+            buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+            continue
+        yield record
+        position = end
+
+def _import_json(conn, path):
+    """Import one FDC JSON file (its top-level key lists the foods), streaming its records"""
+    with open(path, encoding="utf-8") as f:
+        foods = iter_json_records(f)
+        while True:
+            batch = list(itertools.islice(foods, IMPORT_BATCH_ROWS // 10))
+            if not batch:
+                return
+            with conn:
+                for food in batch:
+                    category = food.get("foodCategory")
+                    if isinstance(category, dict):
+                        category = category.get("description")
+                    category = category or food.get("brandedFoodCategory")
+                    conn.execute(INSERT_FOOD, _food_row(food["fdcId"], food.get("description", ""),
+                                                        food.get("dataType"), category, food.get("ingredients")))
+                    conn.executemany(INSERT_NUTRIENT, _nutrient_rows(
+                        (food["fdcId"], entry["nutrient"]["id"], entry.get("amount"))
+                        for entry in food.get("foodNutrients", []) if "id" in (entry.get("nutrient") or {})
+                    ))
+
+def import_fdc(sources, path=FDC_DB_PATH):
+    """
+    Import FDC downloads and atomically replace the store
+
+    Args:
+        sources (list): CSV download directories and/or JSON files
+        path (str): Destination SQLite file
+
+    Returns:
+        int: Number of foods imported
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".fdc-", suffix=".sqlite3", dir=directory)
+    os.close(fd)
+
+    try:
+        conn = sqlite3.connect(tmp_path)
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(SCHEMA)
+        for source in sources:
+            if os.path.isdir(source):
+                _import_csv(conn, source)
+            else:
+                _import_json(conn, source)
+            logger.debug(f"Imported {source}")
+        count = conn.execute("SELECT COUNT(*) FROM foods").fetchone()[0]
+        # Building the indexes after the bulk insert is much faster
+        with conn:
+            conn.executescript(INDEXES)
+        conn.execute("VACUUM")
+        conn.close()
+        os.replace(tmp_path, path)
+        return count
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+class FDCStore:
+    """
+    Read-only nutrient lookups against an imported FDC file
+
+    A food name is matched exactly (normalized) first, then by full-text
+    search requiring every word (stemmed, so "banana" finds "bananas").
+    Among matches, generic data types are preferred over branded products
+    and shorter descriptions over longer ones.
+
+    Each thread gets its own connection. At most every reload_interval
+    seconds a lookup stats the file; when an import has replaced it, the
+    generation is bumped and threads reopen their connections on the new
+    file (an open connection would keep reading the replaced one).
+    """
+
+    def __init__(self, path=FDC_DB_PATH, reload_interval=FDC_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.generation = 0
+        self._signature = None
+        self._next_check = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _check_reload(self):
+        """Switch to a replaced file, checking at most every reload_interval seconds"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        with self._lock:
+            self._next_check = now + self.reload_interval
+            try:
+                signature = self._file_signature()
+            except OSError as e:
+                logger.error(f"FDC store unavailable ({self.path}): {str(e)}")
+                return
+            if signature != self._signature:
+                if self._signature is not None:
+                    logger.debug(f"FDC store changed on disk; reloading {self.path}")
+                self._signature = signature
+                self.generation += 1
+
+    def _connect(self):
+        """Returns this thread's connection for the current generation"""
+        self._check_reload()
+        local = self._local
+        if getattr(local, "generation", None) != self.generation:
+            if getattr(local, "conn", None) is not None:
+                local.conn.close()
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute("PRAGMA mmap_size=268435456")
+            local.conn = conn
+            local.generation = self.generation
+        return local.conn
+
+    def _best_match(self, conn, name):
+        row = conn.execute(
+            "SELECT fdc_id FROM foods WHERE name = ? ORDER BY data_rank, fdc_id LIMIT 1", (name,)
+        ).fetchone()
+        if row:
+            return row[0]
+        words = name.split()
+        if not words:
+            return None
+        query = " AND ".join(f'"{word}"' for word in words)
+        row = conn.execute(
+            "SELECT foods.fdc_id FROM food_names JOIN foods ON foods.fdc_id = food_names.rowid"
+            " WHERE food_names MATCH ? ORDER BY foods.data_rank, length(foods.name), foods.fdc_id LIMIT 1",
+            (query,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def lookup(self, food_name):
+        """
+        Find a food and its nutrients
+
+        Args:
+            food_name (str): Food name as entered by the user
+
+        Returns:
+            dict: fdc_id, description, data_type, category, ingredients (list)
+                  and nutrients (per 100 g), or None if no food matches
+        """
+        name = normalize_name(food_name)
+        try:
+            conn = self._connect()
+            fdc_id = self._best_match(conn, name)
+            if fdc_id is None:
+                return None
+            description, data_type, category, ingredients = conn.execute(
+                "SELECT description, data_type, category, ingredients FROM foods WHERE fdc_id = ?", (fdc_id,)
+            ).fetchone()
+            nutrients = dict(conn.execute(
+                "SELECT nutrient, amount FROM food_nutrients WHERE fdc_id = ?", (fdc_id,)
+            ).fetchall())
+        except sqlite3.Error as e:
+            logger.error(f"FDC lookup failed for {food_name}: {str(e)}")
+            return None
+
+        nutrients["serving_size"] = "100g"
+        return {
+            "fdc_id": fdc_id,
+            "description": description,
+            "data_type": data_type,
+            "category": category,
+            "ingredients": [item.strip().lower() for item in (ingredients or "").split(",") if item.strip()],
+            "nutrients": nutrients,
+        }
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_fdc_store():
+    """Returns the FDC store, or None if nothing has been imported to FDC_DB_PATH"""
+    global _store
+    with _store_lock:
+        if _store is None and os.path.exists(FDC_DB_PATH):
+            _store = FDCStore()
+        return _store
+
+def main():
+    parser = argparse.ArgumentParser(description="Import FoodData Central downloads into the local nutrient store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    importer = subparsers.add_parser("import", help="import CSV directories and/or JSON files")
+    importer.add_argument("sources", nargs="+")
+    importer.add_argument("--output", default=FDC_DB_PATH, help="destination SQLite file")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        start = time.perf_counter()
+        count = import_fdc(args.sources, args.output)
+        print(f"Imported {count} foods into {args.output} in {time.perf_counter() - start:.1f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+from functools import lru_cache
+from term_matcher import ContainedTermIndex, ContainingTermIndex
+from food_names import normalize_food_name
+
+# Each scheme lists its categories in priority order, with the keywords that
+# put a food in the category. A food name matches a keyword when it contains
+# it ("pineapple" is a fruit), so compound names are classified too.
+CATEGORY_SCHEMES = {
+    # Foods named after a benefit category ("fruit salad", "dried fish"),
+    # or contained in a category name
+    "benefit_category": [
+        ("fruit", ["fruit"]), ("vegetable", ["vegetable"]), ("nuts", ["nuts"]), ("fish", ["fish"]),
+        ("grain", ["grain"]), ("dairy", ["dairy"]), ("meat", ["meat"]), ("legume", ["legume"]),
+    ],
+    # Benefit category by typical food
+    "benefit_type": [
+        ("fruit", ["apple", "banana", "orange", "berry", "fruit"]),
+        ("vegetable", ["salad", "spinach", "kale", "broccoli", "vegetable", "carrot"]),
+        ("nuts", ["almond", "walnut", "cashew", "pistachio", "nut"]),
+        ("fish", ["salmon", "tuna", "cod", "fish", "seafood"]),
+        ("grain", ["rice", "wheat", "oat", "barley", "grain", "bread", "pasta"]),
+        ("dairy", ["milk", "cheese", "yogurt", "dairy"]),
+        ("meat", ["beef", "pork", "chicken", "lamb", "meat"]),
+        ("legume", ["bean", "lentil", "pea", "chickpea", "legume"]),
+    ],
+    # Foods named after a risk category ("fried rice", "processed cheese")
+    "risk_category": [
+        ("processed", ["processed"]), ("fried", ["fried"]), ("sugary", ["sugary"]),
+        ("fast food", ["fast food"]), ("alcohol", ["alcohol"]), ("caffeine", ["caffeine"]),
+        ("red meat", ["red meat"]), ("dairy", ["dairy"]),
+    ],
+    # Risk category by typical food
+    "risk_type": [
+        ("processed", ["processed", "canned", "packaged", "instant", "microwave"]),
+        ("fried", ["fried", "deep-fried", "crispy", "battered"]),
+        ("sugary", ["sweet", "candy", "chocolate", "dessert", "cake", "cookie", "pastry"]),
+        ("fast food", ["burger", "pizza", "fast food", "takeout", "take-away"]),
+        ("alcohol", ["beer", "wine", "liquor", "cocktail", "alcohol"]),
+        ("caffeine", ["coffee", "energy drink", "tea", "caffeine"]),
+        ("red meat", ["beef", "steak", "pork", "lamb", "veal", "venison"]),
+        ("dairy", ["milk", "cheese", "yogurt", "dairy", "cream"]),
+    ],
+    # Generic nutrition profile by typical food
+    "nutrition_type": [
+        ("fruit", ["apple", "banana", "orange", "berry", "fruit"]),
+        ("vegetable", ["salad", "spinach", "kale", "broccoli", "vegetable", "carrot"]),
+        ("meat", ["beef", "pork", "chicken", "lamb", "meat", "steak"]),
+        ("grain", ["rice", "wheat", "oat", "barley", "grain", "bread", "pasta"]),
+        ("dairy", ["milk", "cheese", "yogurt", "dairy"]),
+        ("fast food", ["pizza", "burger", "fries", "fast food"]),
+    ],
+}
+
+# Schemes that also match when the food name is part of a category name
+# ("nut" is in the "nuts" category)
+REVERSE_SCHEMES = ["benefit_category"]
+
+class FoodClassifier:
+    """
+    Classifies food names under every category scheme at once
+
+    The keywords of all schemes go into one trie, mapped to the (scheme,
+    category) pairs they stand for, so a single walk over the food name
+    finds every matching category; each scheme then keeps its
+    highest-priority one. Results are memoized per name.
+    """
+
+    def __init__(self, schemes=CATEGORY_SCHEMES, reverse_schemes=REVERSE_SCHEMES):
+        self.schemes = list(schemes)
+        keyword_ids = {}
+        self.keyword_targets = []  # keyword id -> [(scheme, category rank)]
+        self.categories = {}
+        for scheme, categories in schemes.items():
+            self.categories[scheme] = [category for category, _ in categories]
+            for rank, (_, keywords) in enumerate(categories):
+                for keyword in keywords:
+                    if keyword not in keyword_ids:
+                        keyword_ids[keyword] = len(self.keyword_targets)
+                        self.keyword_targets.append([])
+                    self.keyword_targets[keyword_ids[keyword]].append((scheme, rank))
+        self.keywords = ContainedTermIndex(keyword_ids)
+        self.reverse = {scheme: ContainingTermIndex(self.categories[scheme]) for scheme in reverse_schemes}
+        self.classify = lru_cache(maxsize=4096)(self._classify)
+
+    def _classify(self, food_lower):
+        """
+        Categories of a lowercased food name
+
+        Returns:
+            dict: Scheme -> highest-priority matching category, or None
+        """
+        best = {}
+        for keyword_id in self.keywords.all(food_lower):
+            for scheme, rank in self.keyword_targets[keyword_id]:
+                if rank < best.get(scheme, len(self.categories[scheme])):
+                    best[scheme] = rank
+        for scheme, index in self.reverse.items():
+            rank = index.best(food_lower)
+            if rank is not None and rank < best.get(scheme, len(self.categories[scheme])):
+                best[scheme] = rank
+        return {scheme: self.categories[scheme][best[scheme]] if scheme in best else None
+                for scheme in self.schemes}
+
+_classifier = FoodClassifier()
+
+def classify_food(food_name):
+    """
+    Classify a food under every category scheme (see CATEGORY_SCHEMES)
+
+    Args:
+        food_name (str): Name of the food
+
+    Returns:
+        dict: Scheme -> category name, or None if no category matches
+    """
+    return dict(_classifier.classify(normalize_food_name(food_name)))
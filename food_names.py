@@ -0,0 +1,71 @@
+import re
+from functools import lru_cache
+
+# Words that describe a food without changing what it is ("ripe banana")
+NEUTRAL_MODIFIERS = {
+    "a", "an", "the", "some", "fresh", "ripe", "organic", "natural",
+    "large", "small", "medium", "big", "sliced", "chopped", "diced",
+}
+
+# Words whose plural is the usual name of the food (or that only look plural)
+INVARIANT_WORDS = {
+    "fries", "oats", "grits", "greens", "molasses", "hummus", "asparagus", "couscous",
+    "swiss", "brussels", "citrus", "schnapps", "series", "species",
+}
+
+# Plurals of words ending in "ie" ("pies" -> "pie", not "py")
+IE_PLURALS = {"pies", "cookies", "brownies", "smoothies", "veggies", "calories", "hoagies", "sweeties"}
+
+# Other names for the same food -> the name used by the indexes and caches
+FOOD_SYNONYMS = {
+    "fry": "french fries", "french fry": "french fries",
+    "yoghurt": "yogurt",
+    "aubergine": "eggplant", "brinjal": "eggplant",
+    "courgette": "zucchini",
+    "garbanzo": "chickpea", "garbanzo bean": "chickpea", "chana": "chickpea",
+    "prawn": "shrimp",
+    "maize": "corn", "sweetcorn": "corn",
+    "porridge": "oats", "oatmeal": "oats",
+    "capsicum": "bell pepper",
+    "coriander leaf": "cilantro",
+}
+
+WORD_PATTERN = re.compile(r"[^\W_]+(?:['-][^\W_]+)*")
+
+def singularize(word):
+    """Singular form of an English food word ("berries" -> "berry")"""
+    if word in INVARIANT_WORDS or len(word) <= 3:
+        return word
+    if word in IE_PLURALS:
+        return word[:-1]
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "sses", "xes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+@lru_cache(maxsize=65536)
+def normalize_food_name(food_name):
+    """
+    Canonical form of a food name
+
+    Case-folds, keeps only the words (dropping punctuation and extra
+    whitespace), removes neutral modifiers, singularizes the last word and
+    maps synonyms, so "Bananas", "banana " and "ripe banana" are all
+    "banana". Every food cache and index is keyed on this form.
+
+    Args:
+        food_name (str): Food name as entered by the user
+
+    Returns:
+        str: Canonical name (the case-folded input if nothing is left after cleaning)
+    """
+    words = WORD_PATTERN.findall(food_name.casefold())
+    kept = [word for word in words if word not in NEUTRAL_MODIFIERS] or words
+    if not kept:
+        return " ".join(food_name.casefold().split())
+    kept[-1] = singularize(kept[-1])
+    name = " ".join(kept)
+    return FOOD_SYNONYMS.get(name, name)
@@ -0,0 +1,125 @@
+from functools import lru_cache
+
+class FuzzyResolver:
+    """
+    Resolve misspelled names to a canonical vocabulary entry
+
+    Built once over a vocabulary: every name is split into character
+    trigrams and indexed in an inverted index. A lookup only compares the
+    query against names that share enough trigrams with it (the q-gram
+    lemma guarantees no name within the edit budget is missed), then
+    verifies the few candidates with a bounded edit distance.
+    """
+
+    def __init__(self, vocabulary):
+        """
+        Args:
+            vocabulary (iterable): Canonical names (lowercase)
+        """
+        self.names = list(dict.fromkeys(name.lower() for name in vocabulary))
+        self.exact = {name: name for name in self.names}
+        self.trigrams = {}
+        self.name_grams = []
+        self.name_bigrams = []
+        for name_id, name in enumerate(self.names):
+            grams = frozenset(self._grams(name))
+            self.name_grams.append(grams)
+            self.name_bigrams.append(frozenset(self._grams(name, 2)))
+            for gram in grams:
+                self.trigrams.setdefault(gram, []).append(name_id)
+        self.lengths = [len(name) for name in self.names]
+
+        # The same words recur across prescriptions ("tablet", "daily"), so
+        # remember recent answers
+        self.resolve = lru_cache(maxsize=65536)(self._resolve)
+
+    @staticmethod
+    def _grams(text, q=3):
+        """Character q-grams of the text, padded so that word edges count"""
+        padded = " " * (q - 1) + text + " "
+        return [padded[i:i + q] for i in range(len(padded) - q + 1)]
+
+    @staticmethod
+    def max_distance(token):
+        """Edit budget for a token: short tokens must match exactly"""
+        if len(token) < 5:
+            return 0
+        if len(token) < 10:
+            return 1
+        return 2
+
+    @staticmethod
+    def _edit_distance(a, b, limit):
+        """
+        Levenshtein distance, or limit + 1 as soon as it is known to exceed limit
+
+        Only the diagonal band of width 2 * limit + 1 is computed, so the cost
+        is O(len(a) * limit) rather than O(len(a) * len(b)).
+        """
+        over = limit + 1
+        if abs(len(a) - len(b)) > limit:
+            return over
+        previous = [j if j <= limit else over for j in range(len(b) + 1)]
+        for i in range(1, len(a) + 1):
+            current = [over] * (len(b) + 1)
+            current[0] = i if i <= limit else over
+            best = current[0]
+            char_a = a[i - 1]
+            for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+                cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != b[j - 1]), over)
+                current[j] = cost
+                if cost < best:
+                    best = cost
+            if best > limit:
+                return over
+            previous = current
+        return previous[-1]
+
+    def _resolve(self, token):
+        """
+        Map a token to the closest vocabulary name within its edit budget
+
+        Args:
+            token (str): Word from the (possibly noisy) text
+
+        Returns:
+            str: Canonical name, or None if nothing is close enough
+        """
+        token = token.lower()
+        if token in self.exact:
+            return token
+        limit = self.max_distance(token)
+        if limit == 0:
+            return None
+
+        # q-gram lemma: one edit destroys at most 3 trigrams, so a name within
+        # `limit` edits shares at least len(grams) - 3 * limit of them. It must
+        # therefore contain one of any 3 * limit + 1 of the query's trigrams;
+        # using the rarest ones keeps the candidate set small.
+        grams = set(self._grams(token))
+        min_shared = len(grams) - 3 * limit
+        rarest = sorted(grams, key=lambda gram: len(self.trigrams.get(gram, ())))[:3 * limit + 1]
+        candidates = set()
+        for gram in rarest:
+            candidates.update(self.trigrams.get(gram, ()))
+
+        # The same bound for bigrams (2 per edit) is tighter, and rejects names
+        # that only share a common suffix such as "-statin" before the costly
+        # edit distance is computed
+        bigrams = set(self._grams(token, 2))
+        min_shared_bigrams = len(bigrams) - 2 * limit
+
+        best_name, best_key = None, None
+        for name_id in candidates:
+            if abs(self.lengths[name_id] - len(token)) > limit:
+                continue
+            count = len(grams & self.name_grams[name_id])
+            if count < min_shared or len(bigrams & self.name_bigrams[name_id]) < min_shared_bigrams:
+                continue
+            distance = self._edit_distance(token, self.names[name_id], limit)
+            if distance > limit:
+                continue
+            key = (distance, -count)
+            if best_key is None or key < best_key:
+                best_name, best_key = self.names[name_id], key
+        return best_name
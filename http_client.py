@@ -0,0 +1,223 @@
+import os
+import time
+import random
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeout in seconds
+HTTP_TIMEOUT = (
+    float(os.environ.get("HTTP_CONNECT_TIMEOUT", "3.05")),
+    float(os.environ.get("HTTP_READ_TIMEOUT", "6")),
+)
+
+# Concurrent requests allowed to one host, and how long to wait for a slot
+HTTP_MAX_PER_HOST = int(os.environ.get("HTTP_MAX_PER_HOST", "8"))
+HTTP_HOST_WAIT = float(os.environ.get("HTTP_HOST_WAIT", "2"))
+
+# Retries after the first attempt, for connection errors, timeouts, 429 and 5xx
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", "2"))
+HTTP_BACKOFF = 0.25  # seconds; the n-th retry waits up to HTTP_BACKOFF * 2 ** n
+
+# Responses larger than this are abandoned
+HTTP_MAX_BYTES = int(os.environ.get("HTTP_MAX_BYTES", str(4 * 1024 * 1024)))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+
+class ResponseTooLarge(requests.RequestException):
+    """The response body exceeded the size limit"""
+
+class HostBusy(requests.RequestException):
+    """No request slot for the host became free in time"""
+
+class HTTPResponse:
+    """Fully read response body with its status and headers"""
+
+    def __init__(self, url, status_code, headers, content, encoding, truncated=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+        self.truncated = truncated
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+class HTTPClient:
+    """
+    Shared HTTP client for the scrapers
+
+    - keep-alive: each thread reuses one pooled requests.Session;
+    - every request has a (connect, read) timeout and a response-size limit;
+    - at most max_per_host requests run against one host at a time;
+    - failed attempts are retried a bounded number of times, with full-jitter
+      exponential backoff;
+    - latency and error counters are kept per host (see stats()).
+    """
+
+    def __init__(self, timeout=HTTP_TIMEOUT, max_per_host=HTTP_MAX_PER_HOST, retries=HTTP_RETRIES,
+                 max_bytes=HTTP_MAX_BYTES):
+        self.timeout = timeout
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._host_slots = {}
+        self._host_stats = {}
+
+    def _session(self):
+        """Returns this thread's session (sessions are not shared across threads)"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.max_per_host)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            self._local.session = session
+        return session
+
+    def _host(self, host):
+        """Returns the request slots and counters of a host, creating them on first use"""
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+                self._host_stats[host] = {
+                    "requests": 0, "errors": 0, "retries": 0, "in_flight": 0,
+                    "total_ms": 0.0, "max_ms": 0.0,
+                }
+            return self._host_slots[host], self._host_stats[host]
+
+    def _record(self, counters, **changes):
+        with self._lock:
+            for name, value in changes.items():
+                counters[name] += value
+
+    def _read(self, response, max_bytes, truncate=False):
+        """
+        Read the body, giving up once it exceeds max_bytes
+
+        Returns:
+            tuple: (body, whether it was cut at max_bytes)
+        """
+        length = response.headers.get("Content-Length")
+        if not truncate and length and length.isdigit() and int(length) > max_bytes:
+            raise ResponseTooLarge(f"{response.url}: {length} bytes exceeds the {max_bytes} byte limit")
+        chunks, size = [], 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            size += len(chunk)
+            if size > max_bytes:
+                if truncate:
+                    chunks.append(chunk[:len(chunk) - (size - max_bytes)])
+                    return b"".join(chunks), True
+                raise ResponseTooLarge(f"{response.url}: body exceeds the {max_bytes} byte limit")
+            chunks.append(chunk)
+        return b"".join(chunks), False
+
+    def get(self, url, headers=None, params=None, timeout=None, max_bytes=None, truncate=False, retries=None):
+        """
+        GET a URL with the client's limits
+
+        Args:
+            url (str): URL to fetch
+            headers (dict, optional): Extra request headers
+            params (dict, optional): Query parameters
+            timeout (tuple, optional): (connect, read) timeout overriding the default
+            max_bytes (int, optional): Size limit overriding the default
+            truncate (bool): Keep the first max_bytes of a larger body instead of failing
+            retries (int, optional): Retries overriding the default (0 for callers
+                working to a deadline, which cannot wait for backoff)
+
+        Returns:
+            HTTPResponse: The final response (which may be an error status)
+
+        Raises:
+            requests.RequestException: When every attempt failed
+        """
+        timeout = timeout or self.timeout
+        max_bytes = max_bytes or self.max_bytes
+        retries = self.retries if retries is None else retries
+        slots, counters = self._host(urlsplit(url).netloc)
+
+        for attempt in range(retries + 1):
+            if attempt:
+                self._record(counters, retries=1)
+                time.sleep(random.uniform(0, HTTP_BACKOFF * 2 ** attempt))
+
+            if not slots.acquire(timeout=HTTP_HOST_WAIT):
+                self._record(counters, errors=1)
+                raise HostBusy(f"No free request slot for {urlsplit(url).netloc}")
+            self._record(counters, requests=1, in_flight=1)
+            start = time.perf_counter()
+            try:
+                with self._session().get(url, headers=headers, params=params, timeout=timeout,
+                                         stream=True) as response:
+                    body, truncated = self._read(response, max_bytes, truncate)
+                    result = HTTPResponse(response.url, response.status_code, response.headers,
+                                          body, response.encoding, truncated)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(counters, errors=1)
+                if attempt == retries:
+                    raise
+                logger.debug(f"Retrying {url} after {type(e).__name__}")
+                continue
+            except requests.RequestException:
+                self._record(counters, errors=1)
+                raise
+            finally:
+                elapsed = (time.perf_counter() - start) * 1000
+                with self._lock:
+                    counters["in_flight"] -= 1
+                    counters["total_ms"] += elapsed
+                    counters["max_ms"] = max(counters["max_ms"], elapsed)
+                slots.release()
+
+            if result.status_code >= 400:
+                self._record(counters, errors=1)
+            if result.status_code in RETRY_STATUSES and attempt < retries:
+                logger.debug(f"Retrying {url} after HTTP {result.status_code}")
+                continue
+            return result
+
+    def stats(self):
+        """
+        Returns per-host counters
+
+        Returns:
+            dict: Host -> requests, errors, retries, in_flight, avg_ms and max_ms
+        """
+        with self._lock:
+            stats = {}
+            for host, counters in self._host_stats.items():
+                host_stats = dict(counters)
+                total_ms = host_stats.pop("total_ms")
+                host_stats["avg_ms"] = round(total_ms / host_stats["requests"], 1) if host_stats["requests"] else 0.0
+                host_stats["max_ms"] = round(host_stats["max_ms"], 1)
+                stats[host] = host_stats
+            return stats
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Returns the process-wide HTTP client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HTTPClient()
+        return _client
@@ -0,0 +1,447 @@
+"""
+SQLite-backed food safety knowledge store
+
+The knowledge base lives in a single read-only SQLite file that every worker
+process memory-maps, so the data is shared through the OS page cache instead
+of being copied into each process. Lookups are indexed queries against tables
+that are precomputed when the file is built (including the brand -> generic
+-> class alias closure), and an FTS5 index over drug, condition and food terms
+serves fuzzy lookups.
+
+The file is rebuilt atomically (written to a temporary file and renamed over
+the old one), and running workers notice the new file and switch to it
+without a restart. A file built from the built-in data records a hash of
+that data and is rebuilt when models.py changes; if it cannot be written,
+the process builds a private copy instead of running without data.
+
+Usage:
+    python knowledge_store.py build [--source knowledge.json] [--output PATH]
+
+The optional JSON source has the same keys as the FoodSafetyKnowledge class
+attributes (INTERACTIONS, CONDITIONS, ALLERGIES, BRAND_NAMES, DRUG_CLASSES,
+CONDITION_ALIASES); without it the built-in data in models.py is used.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import argparse
+import tempfile
+import threading
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_DB_PATH = os.environ.get(
+    "KNOWLEDGE_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "knowledge.sqlite3"),
+)
+
+# How often (seconds) workers check whether the knowledge file was replaced
+KNOWLEDGE_RELOAD_INTERVAL = float(os.environ.get("KNOWLEDGE_RELOAD_INTERVAL", "2"))
+
+# Bytes of the file memory-mapped by each connection
+KNOWLEDGE_MMAP_SIZE = 256 * 1024 * 1024
+
+# Per-process memo of lookup results, cleared whenever the file is reloaded
+MEMO_MAX_ENTRIES = 10000
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+DATA_KEYS = ("INTERACTIONS", "CONDITIONS", "ALLERGIES", "BRAND_NAMES", "DRUG_CLASSES", "CONDITION_ALIASES")
+
+SCHEMA = """
+CREATE TABLE interactions (drug TEXT NOT NULL, food TEXT NOT NULL, position INTEGER NOT NULL);
+CREATE TABLE conditions (condition TEXT NOT NULL, food TEXT NOT NULL, position INTEGER NOT NULL);
+CREATE TABLE allergies (name TEXT PRIMARY KEY, position INTEGER NOT NULL);
+CREATE TABLE medication_names (name TEXT NOT NULL, resolved TEXT NOT NULL, position INTEGER NOT NULL);
+CREATE TABLE medication_foods (name TEXT NOT NULL, food TEXT NOT NULL, position INTEGER NOT NULL);
+CREATE TABLE condition_foods (name TEXT NOT NULL, food TEXT NOT NULL, position INTEGER NOT NULL);
+CREATE INDEX interactions_drug ON interactions (drug, position);
+CREATE INDEX conditions_condition ON conditions (condition, position);
+CREATE INDEX medication_names_name ON medication_names (name, position);
+CREATE INDEX medication_foods_name ON medication_foods (name, position);
+CREATE INDEX condition_foods_name ON condition_foods (name, position);
+CREATE VIRTUAL TABLE terms USING fts5(term, kind UNINDEXED);
+CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+class KnowledgeStoreError(Exception):
+    """The knowledge store could not be opened or built"""
+
+def seed_data():
+    """Returns the built-in knowledge base from models.FoodSafetyKnowledge"""
+    from models import FoodSafetyKnowledge
+    return {key: getattr(FoodSafetyKnowledge, key) for key in DATA_KEYS}
+
+def data_hash(data):
+    """SHA-256 of the knowledge data, recorded in the file to detect changes"""
+    canonical = json.dumps({key: data.get(key) for key in DATA_KEYS}, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def read_meta(path):
+    """
+    Returns the meta table of a knowledge file (source and data_hash), or None
+    if the file is missing, unreadable or was built before the table existed
+    """
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return dict(conn.execute("SELECT name, value FROM meta").fetchall())
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+def _resolve_aliases(data):
+    """
+    Follow brand -> generic -> class aliases transitively
+
+    Returns:
+        dict: Medication name -> names it resolves to (itself first)
+    """
+    graph = {}
+    for brand, generic in data["BRAND_NAMES"].items():
+        graph.setdefault(brand, set()).add(generic)
+    for generic, classes in data["DRUG_CLASSES"].items():
+        graph.setdefault(generic, set()).update(classes)
+
+    medication_names = {}
+    for name in set(graph) | set(data["INTERACTIONS"]):
+        resolved, stack = [], [name]
+        while stack:
+            current = stack.pop()
+            if current in resolved:
+                continue
+            resolved.append(current)
+            stack.extend(sorted(graph.get(current, ())))
+        medication_names[name] = resolved
+    return medication_names
+
+def build_knowledge_db(path=KNOWLEDGE_DB_PATH, data=None):
+    """
+    Build the knowledge file and atomically replace any existing one
+
+    Args:
+        path (str): Destination of the SQLite file
+        data (dict, optional): Knowledge data (see DATA_KEYS); defaults to seed_data()
+    """
+    source = "custom" if data else "seed"
+    data = data or seed_data()
+    data = {key: data.get(key) or ({} if key != "ALLERGIES" else []) for key in DATA_KEYS}
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".knowledge-", suffix=".sqlite3", dir=directory)
+    os.close(fd)
+
+    try:
+        conn = sqlite3.connect(tmp_path)
+        with conn:
+            conn.executescript(SCHEMA)
+
+            conn.executemany(
+                "INSERT INTO interactions VALUES (?, ?, ?)",
+                [(drug, food, i) for drug, foods in data["INTERACTIONS"].items() for i, food in enumerate(foods)],
+            )
+            conn.executemany(
+                "INSERT INTO conditions VALUES (?, ?, ?)",
+                [(cond, food, i) for cond, foods in data["CONDITIONS"].items() for i, food in enumerate(foods)],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO allergies VALUES (?, ?)",
+                [(allergy, i) for i, allergy in enumerate(data["ALLERGIES"])],
+            )
+
+            # Precomputed alias closure and the foods every name resolves to
+            medication_names = _resolve_aliases(data)
+            for name, resolved in medication_names.items():
+                conn.executemany(
+                    "INSERT INTO medication_names VALUES (?, ?, ?)",
+                    [(name, entry, i) for i, entry in enumerate(resolved)],
+                )
+                foods = []
+                for entry in resolved:
+                    for food in data["INTERACTIONS"].get(entry, []):
+                        if food not in foods:
+                            foods.append(food)
+                conn.executemany(
+                    "INSERT INTO medication_foods VALUES (?, ?, ?)",
+                    [(name, food, i) for i, food in enumerate(foods)],
+                )
+
+            condition_foods = dict(data["CONDITIONS"])
+            for alias, cond in data["CONDITION_ALIASES"].items():
+                if cond in data["CONDITIONS"]:
+                    condition_foods[alias] = data["CONDITIONS"][cond]
+            conn.executemany(
+                "INSERT INTO condition_foods VALUES (?, ?, ?)",
+                [(name, food, i) for name, foods in condition_foods.items() for i, food in enumerate(foods)],
+            )
+
+            # Full-text index over every term, for fuzzy lookups
+            terms = {(drug, "drug") for drug in data["INTERACTIONS"]}
+            terms |= {(name, "medication") for name in medication_names}
+            terms |= {(cond, "condition") for cond in condition_foods}
+            terms |= {(food, "food") for foods in data["INTERACTIONS"].values() for food in foods}
+            terms |= {(food, "food") for foods in data["CONDITIONS"].values() for food in foods}
+            terms |= {(allergy, "allergy") for allergy in data["ALLERGIES"]}
+            conn.executemany("INSERT INTO terms (term, kind) VALUES (?, ?)", sorted(terms))
+
+            conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                             [("source", source), ("data_hash", data_hash(data))])
+        conn.execute("VACUUM")
+        conn.close()
+
+        # mkstemp creates the file as 0600; workers may run as another user
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+        logger.debug(f"Built knowledge store at {path}")
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+class KnowledgeStore:
+    """
+    Read-only, memory-mapped view of the knowledge file with hot reload
+
+    Each thread gets its own connection. At most every reload_interval
+    seconds a lookup stats the file; when it has been replaced, the
+    generation is bumped, the memo is cleared and threads reopen their
+    connections on the new file. Connections still reading the old file keep
+    a consistent view of it until they are reopened.
+    """
+
+    def __init__(self, path=KNOWLEDGE_DB_PATH, reload_interval=KNOWLEDGE_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.generation = 0
+        self._signature = None
+        self._next_check = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._memo = {}
+
+        self._ensure_current()
+        self._check_reload(force=True)
+
+    def _ensure_current(self):
+        """
+        Build the file from the built-in data if it is missing, unreadable or
+        built from an older version of that data
+
+        Files built from a custom source are left alone. If the file cannot
+        be written, a private copy is built in a temporary directory so that
+        lookups never run without data.
+
+        Raises:
+            KnowledgeStoreError: When no usable file could be built
+        """
+        meta = read_meta(self.path)
+        if meta is not None and (meta.get("source") == "custom"
+                                 or meta.get("data_hash") == data_hash(seed_data())):
+            return
+        reason = "not found" if not os.path.exists(self.path) else "out of date or unreadable"
+        logger.debug(f"Knowledge store {reason} at {self.path}; building it from the built-in data")
+        try:
+            build_knowledge_db(self.path)
+            return
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Could not build the knowledge store at {self.path}: {str(e)}")
+        try:
+            private_path = os.path.join(tempfile.mkdtemp(prefix="healthy-knowledge-"), "knowledge.sqlite3")
+            build_knowledge_db(private_path)
+        except (OSError, sqlite3.Error) as e:
+            raise KnowledgeStoreError(f"No usable knowledge store: {str(e)}") from e
+        logger.warning(f"Using a private knowledge store at {private_path}")
+        self.path = private_path
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _check_reload(self, force=False):
+        """Switch to a replaced knowledge file, checking at most every reload_interval seconds"""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
+        with self._lock:
+            self._next_check = now + self.reload_interval
+            try:
+                signature = self._file_signature()
+            except OSError as e:
+                logger.error(f"Knowledge store unavailable ({self.path}): {str(e)}")
+                return
+            if signature != self._signature:
+                if self._signature is not None:
+                    logger.debug(f"Knowledge store changed on disk; reloading {self.path}")
+                self._signature = signature
+                self._memo = {}
+                self.generation += 1
+
+    def refresh(self):
+        """
+        Pick up a replaced knowledge file (checked at most every reload_interval seconds)
+
+        Returns:
+            int: The generation, which increases every time the file is reloaded
+        """
+        self._check_reload()
+        return self.generation
+
+    def _connect(self):
+        """Returns this thread's connection for the current generation"""
+        self._check_reload()
+        local = self._local
+        if getattr(local, "generation", None) != self.generation:
+            if getattr(local, "conn", None) is not None:
+                local.conn.close()
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size={KNOWLEDGE_MMAP_SIZE}")
+            conn.execute("PRAGMA query_only=1")
+            local.conn = conn
+            local.generation = self.generation
+        return local.conn
+
+    def _memoized(self, key, compute):
+        conn = self._connect()
+        memo = self._memo
+        if key in memo:
+            return memo[key]
+        value = compute(conn)
+        if len(memo) >= MEMO_MAX_ENTRIES:
+            memo.clear()
+        memo[key] = value
+        return value
+
+    def _column(self, conn, sql, params=()):
+        return [row[0] for row in conn.execute(sql, params)]
+
+    def search_terms(self, query, kind=None, limit=20):
+        """
+        Full-text search over drug, medication, condition, food and allergy terms
+
+        Every word of the query is matched as a prefix, and any word may match.
+
+        Args:
+            query (str): Free text
+            kind (str, optional): Restrict to one kind of term
+            limit (int): Maximum results
+
+        Returns:
+            list: Matching terms, best first
+        """
+        tokens = TOKEN_PATTERN.findall(query.lower())
+        if not tokens:
+            return []
+        fts_query = " OR ".join(f'"{token}"*' for token in tokens)
+
+        def compute(conn):
+            if kind:
+                sql = "SELECT term FROM terms WHERE terms MATCH ? AND kind = ? ORDER BY rank LIMIT ?"
+                return self._column(conn, sql, (fts_query, kind, limit))
+            return self._column(conn, "SELECT term FROM terms WHERE terms MATCH ? ORDER BY rank LIMIT ?",
+                                (fts_query, limit))
+
+        return self._memoized(("search", query.lower(), kind, limit), compute)
+
+    def _closest(self, name, kind):
+        """
+        Term of the given kind that contains the name or is contained in it
+
+        Replaces the old linear substring scan: FTS5 narrows the candidates,
+        then the substring rule is applied to those few.
+        """
+        for term in self.search_terms(name, kind):
+            if term in name or name in term:
+                return term
+        # Substrings that do not start at a word boundary ("tabwarfarin")
+        row = self._connect().execute(
+            "SELECT term FROM terms WHERE kind = ? AND (instr(?, term) > 0 OR instr(term, ?) > 0) LIMIT 1",
+            (kind, name, name),
+        ).fetchone()
+        return row[0] if row else None
+
+    def medication_names(self, name):
+        """Names a medication is known by (itself, generic, classes)"""
+        name = name.lower().strip()
+
+        def compute(conn):
+            names = self._column(conn, "SELECT resolved FROM medication_names WHERE name = ? ORDER BY position", (name,))
+            return names or [name]
+
+        return list(self._memoized(("names", name), compute))
+
+    def medication_foods(self, name):
+        """Foods that may interact with a medication, brand and class aliases included"""
+        name = name.lower().strip()
+
+        def compute(conn):
+            foods = self._column(conn, "SELECT food FROM medication_foods WHERE name = ? ORDER BY position", (name,))
+            if foods:
+                return foods
+            known = conn.execute("SELECT 1 FROM medication_names WHERE name = ? LIMIT 1", (name,)).fetchone()
+            if known:
+                return []  # known drug without food interactions
+            drug = self._closest(name, "drug")
+            if drug is None:
+                return []
+            return self._column(conn, "SELECT food FROM interactions WHERE drug = ? ORDER BY position", (drug,))
+
+        return list(self._memoized(("medication", name), compute))
+
+    def condition_foods(self, condition):
+        """Foods to avoid for a medical condition (aliases included)"""
+        condition = condition.lower().strip()
+
+        def compute(conn):
+            foods = self._column(conn, "SELECT food FROM condition_foods WHERE name = ? ORDER BY position", (condition,))
+            if foods:
+                return foods
+            match = self._closest(condition, "condition")
+            if match is None:
+                return []
+            return self._column(conn, "SELECT food FROM condition_foods WHERE name = ? ORDER BY position", (match,))
+
+        return list(self._memoized(("condition", condition), compute))
+
+    def allergies(self):
+        """Common food allergies"""
+        return list(self._memoized(("allergies",), lambda conn: self._column(
+            conn, "SELECT name FROM allergies ORDER BY position")))
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    """Returns the process-wide knowledge store, opening it on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = KnowledgeStore()
+        return _store
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the food safety knowledge store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="build the SQLite knowledge file")
+    build.add_argument("--source", help="JSON file with the knowledge data (defaults to the built-in data)")
+    build.add_argument("--output", default=KNOWLEDGE_DB_PATH, help="destination SQLite file")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        data = None
+        if args.source:
+            with open(args.source, encoding="utf-8") as f:
+                data = json.load(f)
+        start = time.perf_counter()
+        build_knowledge_db(args.output, data)
+        print(f"Built {args.output} in {time.perf_counter() - start:.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Pages wider than this are downscaled before the layout analysis (crops are
+# still taken from the full-resolution image)
+ANALYSIS_MAX_WIDTH = 1200
+
+# Padding (in full-resolution pixels) added around every line crop
+LINE_PADDING = 6
+
+def _otsu_threshold(gray):
+    """
+    Compute a global binarization threshold with Otsu's method
+
+    Args:
+        gray (numpy.ndarray): 2D uint8 grayscale image
+
+    Returns:
+        int: Threshold; pixels darker than it are treated as ink
+    """
+    import numpy as np
+
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = gray.size
+    levels = np.arange(256)
+
+    weight_bg = np.cumsum(histogram)
+    weight_fg = total - weight_bg
+    cumulative_mean = np.cumsum(histogram * levels)
+    mean_bg = cumulative_mean / np.maximum(weight_bg, 1)
+    mean_fg = (cumulative_mean[-1] - cumulative_mean) / np.maximum(weight_fg, 1)
+
+    between_variance = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between_variance))
+
+def _find_runs(mask):
+    """
+    Find contiguous runs of True values
+
+    Args:
+        mask (numpy.ndarray): 1D boolean array
+
+    Returns:
+        list: (start, end) pairs, end exclusive
+    """
+    import numpy as np
+
+    padded = np.concatenate(([False], mask, [False]))
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(changes[0::2], changes[1::2]))
+
+def segment_lines(image):
+    """
+    Split a page image into text-line crops using a horizontal projection profile
+
+    TrOCR recognizes a single line of text, so a full page has to be cut into
+    lines before recognition.
+
+    Args:
+        image (PIL.Image.Image): Page image
+
+    Returns:
+        list: Line crops (PIL images, RGB) in reading order. Falls back to the
+              whole page if no lines could be found.
+    """
+    import numpy as np
+
+    image = image.convert("RGB")
+    width, height = image.size
+
+    # Analyse a downscaled grayscale copy; it is much cheaper and just as accurate for layout
+    scale = min(1.0, ANALYSIS_MAX_WIDTH / float(width))
+    gray_image = image.convert("L")
+    if scale < 1.0:
+        gray_image = gray_image.resize((max(1, int(width * scale)), max(1, int(height * scale))))
+    gray = np.asarray(gray_image)
+
+    ink = gray < _otsu_threshold(gray)
+    small_height, small_width = ink.shape
+
+    # Rows with a meaningful amount of ink belong to a text line
+    row_ink = ink.sum(axis=1)
+    rows = _find_runs(row_ink > max(2, 0.005 * small_width))
+    if not rows:
+        return [image]
+
+    # Merge bands split by small gaps (descenders, dots, faint strokes)
+    heights = sorted(end - start for start, end in rows)
+    median_height = heights[len(heights) // 2]
+    min_gap = max(2, median_height // 4)
+    merged = [list(rows[0])]
+    for start, end in rows[1:]:
+        if start - merged[-1][1] < min_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    # Drop specks and ruling lines that are much thinner than a line of text
+    min_height = max(4, median_height // 3)
+
+    crops = []
+    for start, end in merged:
+        if end - start < min_height:
+            continue
+        band = ink[start:end]
+        cols = np.flatnonzero(band.sum(axis=0) > 0)
+        if cols.size == 0:
+            continue
+
+        # Map back to full resolution and pad
+        left = max(0, int(cols[0] / scale) - LINE_PADDING)
+        right = min(width, int((cols[-1] + 1) / scale) + LINE_PADDING)
+        top = max(0, int(start / scale) - LINE_PADDING)
+        bottom = min(height, int(end / scale) + LINE_PADDING)
+        crops.append(image.crop((left, top, right, bottom)))
+
+    if not crops:
+        return [image]
+
+    logger.debug(f"Segmented page into {len(crops)} text lines")
+    return crops
@@ -0,0 +1,176 @@
+import os
+import time
+import shutil
+import tempfile
+import logging
+import threading
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Hugging Face checkpoint used for handwritten prescription OCR
+TROCR_MODEL_NAME = os.environ.get("TROCR_MODEL_NAME", "microsoft/trocr-base-handwritten")
+
+# Inference backend used for TrOCR (see load_trocr). Pick one with
+# benchmarks/bench_trocr_backends.py before changing the default.
+TROCR_BACKENDS = ("fp32", "int8", "onnx")
+TROCR_BACKEND = os.environ.get("TROCR_BACKEND", "fp32")
+
+# Where the onnx backend keeps its exported model, one subdirectory per checkpoint;
+# the export runs once and every worker loads the saved files
+TROCR_ONNX_DIR = os.environ.get(
+    "TROCR_ONNX_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "onnx"),
+)
+
+# Registry state, guarded by _lock. The heavy libraries (torch, transformers)
+# are only imported inside load_trocr so that importing this module is free.
+_lock = threading.Lock()
+_models = {}
+_status = {
+    "trocr": {
+        "state": "not_loaded",  # not_loaded -> loading -> ready | failed
+        "backend": TROCR_BACKEND,
+        "error": None,
+        "load_seconds": None,
+    }
+}
+_warmup_thread = None
+
+def load_trocr(backend=None):
+    """
+    Import the inference libraries and load the TrOCR processor and model
+
+    Supported backends:
+        fp32 - the stock PyTorch model
+        int8 - PyTorch with dynamic int8 quantization of the Linear layers
+        onnx - encoder/decoder exported to ONNX and run with ONNX Runtime
+               (needs the optional `optimum[onnxruntime]` package)
+
+    Every backend returns a model with a `generate` method that accepts the
+    processor's pixel values, so callers do not need to know which one is in use.
+
+    Args:
+        backend (str, optional): One of TROCR_BACKENDS, defaults to TROCR_BACKEND
+
+    Returns:
+        tuple: (processor, model)
+    """
+    from transformers import TrOCRProcessor, VisionEncoderDecoderModel
+
+    backend = backend or TROCR_BACKEND
+    if backend not in TROCR_BACKENDS:
+        raise ValueError(f"Unknown TrOCR backend '{backend}', expected one of {', '.join(TROCR_BACKENDS)}")
+
+    processor = TrOCRProcessor.from_pretrained(TROCR_MODEL_NAME)
+
+    if backend == "onnx":
+        return processor, load_onnx_model()
+
+    model = VisionEncoderDecoderModel.from_pretrained(TROCR_MODEL_NAME)
+    model.eval()
+
+    if backend == "int8":
+        import torch
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    return processor, model
+
+def onnx_export_dir(model_name=TROCR_MODEL_NAME, cache_dir=TROCR_ONNX_DIR):
+    """Returns the directory holding the ONNX export of a checkpoint"""
+    return os.path.join(cache_dir, model_name.replace("/", "__"))
+
+def load_onnx_model(model_name=TROCR_MODEL_NAME, cache_dir=TROCR_ONNX_DIR):
+    """
+    Load the ONNX export of a checkpoint, exporting it on first use
+
+    The export is saved to cache_dir/<model name> through a temporary
+    directory that is renamed into place, so concurrent workers never load
+    a half-written export; when several export at once, one of them wins.
+
+    Returns:
+        ORTModelForVision2Seq: The model
+    """
+    from optimum.onnxruntime import ORTModelForVision2Seq
+
+    export_dir = onnx_export_dir(model_name, cache_dir)
+    if os.path.exists(os.path.join(export_dir, "config.json")):
+        return ORTModelForVision2Seq.from_pretrained(export_dir)
+
+    logger.debug(f"Exporting {model_name} to ONNX in {export_dir}")
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".export-", dir=cache_dir)
+    try:
+        model = ORTModelForVision2Seq.from_pretrained(model_name, export=True)
+        model.save_pretrained(tmp_dir)
+        os.chmod(tmp_dir, 0o755)
+        try:
+            os.rename(tmp_dir, export_dir)
+        except OSError:
+            logger.debug(f"{export_dir} was exported by another worker")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return ORTModelForVision2Seq.from_pretrained(export_dir)
+
+def get_trocr():
+    """
+    Returns the TrOCR processor and model, loading them on first use
+
+    Concurrent callers block on the same load instead of loading the model twice.
+    A failed load is remembered so that every request does not retry a download.
+
+    Returns:
+        tuple: (processor, model), or (None, None) if the model could not be loaded
+    """
+    if "trocr" in _models:
+        return _models["trocr"]
+
+    with _lock:
+        if "trocr" in _models:
+            return _models["trocr"]
+        if _status["trocr"]["state"] == "failed":
+            return None, None
+
+        _status["trocr"]["state"] = "loading"
+        start = time.perf_counter()
+        try:
+            logger.debug(f"Loading TrOCR model ({TROCR_BACKEND} backend)...")
+            _models["trocr"] = load_trocr()
+            _status["trocr"]["state"] = "ready"
+            logger.debug("TrOCR model loaded successfully")
+        except Exception as e:
+            logger.error(f"Error loading TrOCR model: {str(e)}")
+            _status["trocr"]["state"] = "failed"
+            _status["trocr"]["error"] = str(e)
+            return None, None
+        finally:
+            _status["trocr"]["load_seconds"] = round(time.perf_counter() - start, 3)
+
+    return _models["trocr"]
+
+def is_trocr_ready():
+    """Returns True once the TrOCR model is loaded and usable"""
+    return _status["trocr"]["state"] == "ready"
+
+def start_warmup():
+    """
+    Load the models in a background daemon thread
+
+    Safe to call more than once; only the first call starts a thread.
+    """
+    global _warmup_thread
+    with _lock:
+        if _warmup_thread is not None:
+            return
+        _warmup_thread = threading.Thread(target=get_trocr, name="model-warmup", daemon=True)
+    _warmup_thread.start()
+
+def get_status():
+    """
+    Returns a snapshot of the model loading state for health checks
+
+    Returns:
+        dict: Per-model state, load error and load time
+    """
+    return {name: dict(info) for name, info in _status.items()}
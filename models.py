@@ -1,10 +1,11 @@
-# For now, we don't need database models for this application
-# If needed in the future, can be added using SQLAlchemy as per the blueprint
+# Food safety knowledge base. The class attributes of FoodSafetyKnowledge are
+# only seed data: knowledge_store.py builds its SQLite store from them, and
+# every lookup below is answered from that store.
 
 class FoodSafetyKnowledge:
     """
-    Static knowledge base for food safety (simplified example)
-    In a production environment, this would be stored in a database
+    Knowledge base for food safety
+    The class attributes are the seed data; lookups go to the SQLite store
     """
     
     # Common medication-food interactions
@@ -37,20 +38,84 @@ class FoodSafetyKnowledge:
         "ibs": ["dairy", "wheat", "citrus fruits", "beans", "cabbage"],
     }
     
+    # Brand names and their generic drug
+    BRAND_NAMES = {
+        "coumadin": "warfarin", "jantoven": "warfarin",
+        "lipitor": "atorvastatin", "zocor": "simvastatin", "crestor": "rosuvastatin",
+        "pravachol": "pravastatin", "mevacor": "lovastatin",
+        "prinivil": "lisinopril", "zestril": "lisinopril", "vasotec": "enalapril", "altace": "ramipril",
+        "glucophage": "metformin", "norvasc": "amlodipine",
+        "lopressor": "metoprolol", "toprol": "metoprolol", "cozaar": "losartan",
+        "proventil": "albuterol", "ventolin": "albuterol", "prilosec": "omeprazole",
+        "neurontin": "gabapentin", "synthroid": "levothyroxine", "levoxyl": "levothyroxine",
+        "tylenol": "acetaminophen", "advil": "ibuprofen", "motrin": "ibuprofen",
+        "prozac": "fluoxetine", "zoloft": "sertraline", "celexa": "citalopram",
+        "lasix": "furosemide", "aldactone": "spironolactone", "lanoxin": "digoxin",
+        "singulair": "montelukast", "cipro": "ciprofloxacin", "flagyl": "metronidazole",
+        "nardil": "phenelzine", "parnate": "tranylcypromine", "marplan": "isocarboxazid",
+    }
+    
+    # Generic drugs and the interaction classes (INTERACTIONS keys) they belong to
+    DRUG_CLASSES = {
+        "atorvastatin": ["statins"], "simvastatin": ["statins"], "rosuvastatin": ["statins"],
+        "pravastatin": ["statins"], "lovastatin": ["statins"],
+        "lisinopril": ["ace inhibitors"], "enalapril": ["ace inhibitors"], "ramipril": ["ace inhibitors"],
+        "amoxicillin": ["antibiotics"], "penicillin": ["antibiotics"], "ciprofloxacin": ["antibiotics"],
+        "doxycycline": ["antibiotics"], "tetracycline": ["antibiotics"], "metronidazole": ["antibiotics"],
+        "phenelzine": ["maoi"], "tranylcypromine": ["maoi"], "isocarboxazid": ["maoi"], "selegiline": ["maoi"],
+        "furosemide": ["diuretics"], "hydrochlorothiazide": ["diuretics"], "spironolactone": ["diuretics"],
+        "levothyroxine": ["thyroid medication"], "liothyronine": ["thyroid medication"],
+    }
+    
+    # Other names for the medical conditions in CONDITIONS
+    CONDITION_ALIASES = {
+        "high blood pressure": "hypertension",
+        "hypercholesterolemia": "high cholesterol",
+        "type 2 diabetes": "diabetes", "type 1 diabetes": "diabetes", "diabetes mellitus": "diabetes",
+        "chronic kidney disease": "kidney disease", "ckd": "kidney disease", "renal disease": "kidney disease",
+        "celiac disease": "celiac", "coeliac disease": "celiac", "coeliac": "celiac",
+        "coronary artery disease": "heart disease", "cardiovascular disease": "heart disease",
+        "irritable bowel syndrome": "ibs",
+    }
+    
+    # The data above seeds the SQLite knowledge store (knowledge_store.py);
+    # lookups are answered from the store, which is reloaded when rebuilt
+    
+    @staticmethod
+    def _store():
+        from knowledge_store import get_store
+        return get_store()
+    
+    @staticmethod
+    def generation():
+        """Increases every time the knowledge store is reloaded"""
+        return FoodSafetyKnowledge._store().refresh()
+    
+    @staticmethod
+    def resolve_medication(medication_name):
+        """
+        Returns the names a medication is known by: itself, its generic name and its classes
+        
+        e.g. "lipitor" -> ["lipitor", "atorvastatin", "statins"]
+        """
+        return FoodSafetyKnowledge._store().medication_names(medication_name)
+    
     @staticmethod
     def get_risky_foods_for_medication(medication_name):
         """Returns foods that might interact with the given medication"""
-        medication_name = medication_name.lower()
-        for med, foods in FoodSafetyKnowledge.INTERACTIONS.items():
-            if med in medication_name or medication_name in med:
-                return foods
-        return []
+        return FoodSafetyKnowledge._store().medication_foods(medication_name)
     
     @staticmethod
     def get_foods_to_avoid_for_condition(condition):
         """Returns foods to avoid for a given medical condition"""
-        condition = condition.lower()
-        for cond, foods in FoodSafetyKnowledge.CONDITIONS.items():
-            if cond in condition or condition in cond:
-                return foods
-        return []
+        return FoodSafetyKnowledge._store().condition_foods(condition)
+    
+    @staticmethod
+    def get_allergies():
+        """Returns the common food allergies"""
+        return FoodSafetyKnowledge._store().allergies()
+    
+    @staticmethod
+    def search_terms(query, kind=None):
+        """Full-text search over known drugs, conditions, foods and allergies"""
+        return FoodSafetyKnowledge._store().search_terms(query, kind)
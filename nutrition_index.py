@@ -0,0 +1,118 @@
+import os
+import csv
+import logging
+from term_matcher import ContainedTermIndex, ContainingTermIndex
+from food_categories import classify_food
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Approximate nutritional values per serving, one food per row
+NUTRITION_DATA_PATH = os.environ.get(
+    "NUTRITION_DATA_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "nutrition.csv"),
+)
+
+NUTRIENT_FIELDS = ["calories", "protein", "carbs", "fat", "fiber", "sugar"]
+
+# Generic values by food type (the "nutrition_type" scheme in
+# food_categories.py), for foods without an entry
+CATEGORY_NUTRITION = {
+    "fruit": {"calories": 85, "protein": 1, "carbs": 22, "fat": 0.3, "fiber": 3, "sugar": 15, "serving_size": "1 serving"},
+    "vegetable": {"calories": 35, "protein": 2, "carbs": 7, "fat": 0.3, "fiber": 3, "sugar": 2, "serving_size": "1 cup"},
+    "meat": {"calories": 185, "protein": 25, "carbs": 0, "fat": 10, "fiber": 0, "sugar": 0, "serving_size": "3 oz (85g)"},
+    "grain": {"calories": 180, "protein": 5, "carbs": 37, "fat": 1, "fiber": 2, "sugar": 0.5, "serving_size": "1 serving"},
+    "dairy": {"calories": 120, "protein": 8, "carbs": 10, "fat": 6, "fiber": 0, "sugar": 8, "serving_size": "1 serving"},
+    "fast food": {"calories": 350, "protein": 12, "carbs": 40, "fat": 15, "fiber": 2, "sugar": 5, "serving_size": "1 serving"},
+}
+
+# Default generic food nutritional information
+DEFAULT_NUTRITION = {"calories": 150, "protein": 5, "carbs": 15, "fat": 5, "fiber": 2, "sugar": 5,
+                     "serving_size": "1 serving"}
+
+def _number(value):
+    """Parse a CSV number, keeping whole numbers as int (95, not 95.0)"""
+    number = float(value)
+    return int(number) if number.is_integer() and "." not in value else number
+
+def load_nutrition_data(path=NUTRITION_DATA_PATH):
+    """
+    Load per-food nutritional values from a CSV file
+
+    The file needs a "name" column, the NUTRIENT_FIELDS columns and a
+    "serving_size" column. Rows keep their file order, which decides
+    between several partial matches.
+
+    Args:
+        path (str): CSV file
+
+    Returns:
+        dict: Lowercase food name -> nutrients dict
+    """
+    foods = {}
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                name = row["name"].strip().lower()
+                if not name or name in foods:
+                    continue
+                nutrients = {field: _number(row[field]) for field in NUTRIENT_FIELDS if row.get(field)}
+                nutrients["serving_size"] = row.get("serving_size") or "1 serving"
+                foods[name] = nutrients
+    except (OSError, KeyError, ValueError) as e:
+        logger.error(f"Could not load nutrition data from {path}: {str(e)}")
+    return foods
+
+class NutritionIndex:
+    """
+    Nutritional values by food name, with partial matching
+
+    Built once: an exact-name hash map, a trie of food names (names
+    contained in the query) and a suffix array of food names (names
+    containing the query). A lookup is O(name length) and returns what a
+    scan over the foods in file order would: the exact entry, else the first
+    food whose name contains or is contained in the query, else the values
+    for its food type (see food_categories.py), else the default.
+    """
+
+    def __init__(self, foods, categories=CATEGORY_NUTRITION, default=DEFAULT_NUTRITION):
+        """
+        Args:
+            foods (dict): Lowercase food name -> nutrients, in priority order
+            categories (dict): Food type -> nutrients
+            default (dict): Nutrients when nothing matches
+        """
+        self.foods = foods
+        self.names = list(foods)
+        self.contained = ContainedTermIndex(self.names)
+        self.containing = ContainingTermIndex(self.names)
+        self.categories = categories
+        self.default = default
+
+    def lookup(self, food_name):
+        """
+        Returns nutritional information for a food
+
+        Args:
+            food_name (str): Name of the food
+
+        Returns:
+            dict: Nutrients (calories, protein, carbs, fat, fiber, sugar, serving_size)
+        """
+        return dict(self._match(food_name.lower()))
+
+    def _match(self, food_lower):
+        nutrients = self.foods.get(food_lower)
+        if nutrients is not None:
+            return nutrients
+
+        ranks = [rank for rank in (self.contained.best(food_lower), self.containing.best(food_lower))
+                 if rank is not None]
+        if ranks:
+            return self.foods[self.names[min(ranks)]]
+
+        return self.categories.get(classify_food(food_lower)["nutrition_type"], self.default)
+
+# Built once at import
+NUTRITION_INDEX = NutritionIndex(load_nutrition_data())
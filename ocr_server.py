@@ -0,0 +1,151 @@
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Largest number of line crops decoded in one model.generate call
+OCR_MAX_BATCH = int(os.environ.get("OCR_MAX_BATCH", os.environ.get("TROCR_BATCH_SIZE", "8")))
+
+# How long the server waits for more crops to fill a batch after the first one arrives
+OCR_MAX_WAIT_MS = float(os.environ.get("OCR_MAX_WAIT_MS", "10"))
+
+class OCRBatcher:
+    """
+    In-process OCR inference server with cross-request micro-batching
+
+    Callers from any thread submit line crops; a single inference thread
+    collects the crops that arrive within max_wait_ms of each other (up to
+    max_batch) and decodes them in one batched call. All requests in the
+    worker process share one model and one inference thread.
+
+    The batcher and the model belong to the process: every gunicorn worker
+    loads its own copy. The run commands in .replit pin --workers 1 (with
+    --threads 8) so that the app keeps a single copy; raising the worker
+    count multiplies the model memory and splits batches across workers.
+    """
+
+    def __init__(self, recognize, max_batch=OCR_MAX_BATCH, max_wait_ms=OCR_MAX_WAIT_MS):
+        """
+        Args:
+            recognize (callable): Takes a list of PIL line images and returns
+                their texts in the same order
+            max_batch (int): Maximum crops per batch
+            max_wait_ms (float): Maximum time to wait for a batch to fill
+        """
+        self.recognize_batch = recognize
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self._thread = threading.Thread(target=self._run, name="ocr-server", daemon=True)
+        self._thread.start()
+
+    def submit(self, image):
+        """
+        Queue one line crop for recognition
+
+        Args:
+            image (PIL.Image.Image): Single-line image
+
+        Returns:
+            Future: Resolves to the recognized text
+        """
+        future = Future()
+        self._queue.put((image, future))
+        return future
+
+    def recognize(self, images):
+        """
+        Recognize a list of line crops, blocking until all are done
+
+        Args:
+            images (list): PIL images, one line of text each
+
+        Returns:
+            list: Recognized text for each image, in the same order
+        """
+        futures = [self.submit(image) for image in images]
+        return [future.result() for future in futures]
+
+    def queue_depth(self):
+        """Returns the number of crops waiting for the inference thread"""
+        return self._queue.qsize()
+
+    def stats(self):
+        """
+        Returns batching statistics for health checks
+
+        Returns:
+            dict: queue_depth, batches, items, avg_batch_size and the configuration
+        """
+        with self._stats_lock:
+            batches, items = self.batches, self.items
+        return {
+            "queue_depth": self.queue_depth(),
+            "batches": batches,
+            "items": items,
+            "avg_batch_size": round(items / batches, 2) if batches else 0.0,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+    def _collect_batch(self):
+        """Block for the first crop, then gather more until the batch is full or the wait expires"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # Past the deadline: still take anything already queued, without waiting
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        """Inference thread main loop"""
+        while True:
+            batch = self._collect_batch()
+            images = [image for image, _ in batch]
+            try:
+                texts = self.recognize_batch(images)
+                # A failed model load yields no texts; resolve every crop anyway
+                if len(texts) != len(images):
+                    texts = ["" for _ in images]
+                for (_, future), text in zip(batch, texts):
+                    future.set_result(text)
+            except Exception as e:
+                logger.error(f"Error in OCR batch of {len(batch)}: {str(e)}")
+                for _, future in batch:
+                    future.set_exception(e)
+
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+
+_server = None
+_server_lock = threading.Lock()
+
+def get_ocr_server():
+    """Returns the process-wide OCR server, starting it on first use"""
+    global _server
+    with _server_lock:
+        if _server is None:
+            from text_extractor import recognize_lines
+            _server = OCRBatcher(lambda images: recognize_lines(images, batch_size=len(images)))
+        return _server
+
+def get_status():
+    """Returns the OCR server statistics, or None if it has not been started"""
+    return _server.stats() if _server is not None else None
@@ -1,11 +1,89 @@
+import os
 import re
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from models import FoodSafetyKnowledge
+from term_matcher import TermMatcher, ContainedTermIndex, ContainingTermIndex, trie_pattern
+from fuzzy_matcher import FuzzyResolver
+from food_names import normalize_food_name
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Common medications (simplified list)
+COMMON_MEDICATIONS = [
+    "warfarin", "coumadin", "atorvastatin", "lipitor", "simvastatin", "zocor", 
+    "lisinopril", "prinivil", "zestril", "metformin", "glucophage", "amlodipine", 
+    "norvasc", "metoprolol", "lopressor", "toprol", "losartan", "cozaar", 
+    "albuterol", "proventil", "ventolin", "omeprazole", "prilosec", "gabapentin", 
+    "neurontin", "hydrochlorothiazide", "levothyroxine", "synthroid", "amoxicillin",
+    "penicillin", "aspirin", "ibuprofen", "acetaminophen", "tylenol", "advil",
+    "insulin", "prednisone", "fluoxetine", "prozac", "sertraline", "zoloft",
+    "furosemide", "lasix", "citalopram", "celexa", "montelukast", "singulair"
+]
+
+# Common medical conditions
+COMMON_CONDITIONS = [
+    "diabetes", "hypertension", "high blood pressure", "high cholesterol", 
+    "heart disease", "asthma", "copd", "arthritis", "depression", "anxiety", 
+    "thyroid", "hypothyroidism", "hyperthyroidism", "gerd", "acid reflux",
+    "migraine", "allergies", "gout", "kidney disease", "liver disease",
+    "osteoporosis", "cancer", "epilepsy", "seizures", "parkinsons", 
+    "alzheimers", "celiac", "gluten", "lactose intolerance", "ibs",
+    "crohns", "colitis", "fibromyalgia", "lupus", "psoriasis", "eczema"
+]
+
+def load_medication_vocabulary(path=None):
+    """
+    Extra medication names, one per line, from MEDICATION_VOCABULARY_PATH
+    
+    Returns:
+        list: Lowercase names (empty if no file is configured)
+    """
+    path = path or os.environ.get("MEDICATION_VOCABULARY_PATH")
+    if not path:
+        return []
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [line.strip().lower() for line in f if line.strip()]
+    except OSError as e:
+        logger.error(f"Error loading medication vocabulary from {path}: {str(e)}")
+        return []
+
+MEDICATION_VOCABULARY = list(dict.fromkeys(COMMON_MEDICATIONS + load_medication_vocabulary()))
+
+# Words picked up by the medication patterns that aren't medications
+NON_MEDICATIONS = {"the", "and", "with", "this", "your", "you", "for", "daily", "once", "twice", "day", "morning", "night"}
+
+# All vocabularies compiled once into a single matcher, so a prescription is
+# scanned one time for every known medication and condition
+VOCABULARY_MATCHER = TermMatcher({
+    "medications": MEDICATION_VOCABULARY,
+    "conditions": COMMON_CONDITIONS,
+})
+
+# Resolves OCR-misspelled medication names ("warfarn") to the vocabulary
+MEDICATION_RESOLVER = FuzzyResolver(MEDICATION_VOCABULARY)
+
+# Context patterns, compiled once
+PRESCRIBED_PATTERN = re.compile(r"prescri\w+\s+(\w+)")  # "prescribed medication_name"
+TAKE_PATTERN = re.compile(r"take\s+(\w+)")  # "take medication_name"
+DOSAGE_PATTERN = re.compile(r"(\w+)\s+\d+\s*mg")  # mg dosages often follow medication names
+DIAGNOSED_PATTERN = re.compile(r"diagnos\w+\s+with\s+(\w+(\s+\w+)?)")  # "diagnosed with condition"
+TREAT_PATTERN = re.compile(r"treat\w+\s+(\w+(\s+\w+)?)")  # "treat condition"
+ALLERGIC_PATTERN = re.compile(r"allerg\w+\s+to\s+(\w+(\s+\w+)?)")  # "allergic to food"
+_known_allergy_pattern = (None, None)  # (knowledge generation, compiled pattern)
+
+def known_allergy_pattern():
+    """"allergic to <known allergy>" pattern, recompiled when the knowledge store is reloaded"""
+    global _known_allergy_pattern
+    generation = FoodSafetyKnowledge.generation()
+    if _known_allergy_pattern[0] != generation:
+        pattern = re.compile(r"allerg\w+\s+to\s+(" + trie_pattern(FoodSafetyKnowledge.get_allergies()) + ")")
+        _known_allergy_pattern = (generation, pattern)
+    return _known_allergy_pattern[1]
+
 def analyze_prescription(prescription_text):
     """
     Analyzes a prescription text to identify medications and medical conditions
@@ -15,15 +93,16 @@ def analyze_prescription(prescription_text):
         # Convert text to lowercase for easier matching
         text = prescription_text.lower()
         
-        # Extract information
-        medications = extract_medications(text)
-        conditions = extract_conditions(text)
+        # Extract information (known terms are matched in a single pass)
+        vocabulary_matches = scan_vocabulary(text)
+        medications = extract_medications(text, vocabulary_matches)
+        conditions = extract_conditions(text, vocabulary_matches)
         allergies = extract_allergies(text)
         
         # Get food restrictions for each medication
         medication_restrictions = []
         for med in medications:
-            risky_foods = FoodSafetyKnowledge.get_risky_foods_for_medication(med)
+            risky_foods = get_risky_foods(med)
             if risky_foods:
                 medication_restrictions.extend(risky_foods)
         
@@ -45,91 +124,85 @@ def analyze_prescription(prescription_text):
         }
     
     except Exception as e:
+        # No restrictions would make every food look safe: let the caller report the error
         logger.error(f"Error analyzing prescription: {str(e)}")
-        return {
-            "medications": [],
-            "conditions": [],
-            "allergies": [],
-            "restrictions": []
-        }
+        raise
+
+def get_risky_foods(medication):
+    """
+    Foods that may interact with a medication
+    
+    Combines the built-in knowledge base with foods retrieved from the local
+    interaction corpus (see retrieval.py). Brand names are resolved to their
+    generic name and drug class first.
+    
+    Args:
+        medication (str): Medication name
+        
+    Returns:
+        list: Interacting foods, knowledge base entries first
+    """
+    risky_foods = list(FoodSafetyKnowledge.get_risky_foods_for_medication(medication))
+    try:
+        from retrieval import get_interaction_index
+        # Query the corpus by brand, generic and class name alike
+        names = FoodSafetyKnowledge.resolve_medication(medication)
+        for foods in get_interaction_index().interacting_foods(names).values():
+            for food in foods:
+                if food not in risky_foods:
+                    risky_foods.append(food)
+    except Exception as e:
+        logger.error(f"Error retrieving interactions for {medication}: {str(e)}")
+    return risky_foods
+
+def scan_vocabulary(text):
+    """
+    Find all known medications and conditions in one pass over the text
+    
+    Args:
+        text (str): Lowercased prescription text
+        
+    Returns:
+        dict: "medications" and "conditions" -> lists of matched terms
+    """
+    return VOCABULARY_MATCHER.find(text)
 
-def extract_medications(text):
+def extract_medications(text, vocabulary_matches=None):
     """
     Extract medication names from prescription text
     """
-    medications = []
-    
-    # Common medications (simplified list)
-    common_meds = [
-        "warfarin", "coumadin", "atorvastatin", "lipitor", "simvastatin", "zocor", 
-        "lisinopril", "prinivil", "zestril", "metformin", "glucophage", "amlodipine", 
-        "norvasc", "metoprolol", "lopressor", "toprol", "losartan", "cozaar", 
-        "albuterol", "proventil", "ventolin", "omeprazole", "prilosec", "gabapentin", 
-        "neurontin", "hydrochlorothiazide", "levothyroxine", "synthroid", "amoxicillin",
-        "penicillin", "aspirin", "ibuprofen", "acetaminophen", "tylenol", "advil",
-        "insulin", "prednisone", "fluoxetine", "prozac", "sertraline", "zoloft",
-        "furosemide", "lasix", "citalopram", "celexa", "montelukast", "singulair"
-    ]
-    
-    # Check for common medications in the text
-    for med in common_meds:
-        if med in text:
-            medications.append(med)
-    
-    # Look for patterns like "prescribed medication_name"
-    prescribed_pattern = r"prescri\w+\s+(\w+)"
-    prescribed_matches = re.findall(prescribed_pattern, text)
-    medications.extend(prescribed_matches)
-    
-    # Look for patterns like "take medication_name"
-    take_pattern = r"take\s+(\w+)"
-    take_matches = re.findall(take_pattern, text)
-    medications.extend(take_matches)
-    
-    # Look for mg dosages which often accompany medication names
-    dosage_pattern = r"(\w+)\s+\d+\s*mg"
-    dosage_matches = re.findall(dosage_pattern, text)
-    medications.extend(dosage_matches)
+    if vocabulary_matches is None:
+        vocabulary_matches = scan_vocabulary(text)
+    
+    # Known medications found in the text
+    medications = list(vocabulary_matches["medications"])
+    
+    # Medication names appearing in typical prescription phrasing. Only these
+    # words are resolved against the vocabulary (misspellings are common in
+    # OCR output): resolving every word would turn ordinary prose into drugs
+    # ("aspiring" -> aspirin). A word that isn't close to any known
+    # medication is kept as written.
+    candidates = PRESCRIBED_PATTERN.findall(text) + TAKE_PATTERN.findall(text) + DOSAGE_PATTERN.findall(text)
+    medications.extend(MEDICATION_RESOLVER.resolve(word) or word for word in candidates)
     
     # Remove duplicates and common words that aren't medications
-    non_meds = ["the", "and", "with", "this", "your", "you", "for", "daily", "once", "twice", "day", "morning", "night"]
-    filtered_meds = [med for med in medications if med.lower() not in non_meds and len(med) > 2]
+    filtered_meds = [med for med in medications if med.lower() not in NON_MEDICATIONS and len(med) > 2]
     
     return list(set(filtered_meds))  # Remove duplicates
 
-def extract_conditions(text):
+def extract_conditions(text, vocabulary_matches=None):
     """
     Extract medical conditions from prescription text
     """
-    conditions = []
-    
-    # Common medical conditions
-    common_conditions = [
-        "diabetes", "hypertension", "high blood pressure", "high cholesterol", 
-        "heart disease", "asthma", "copd", "arthritis", "depression", "anxiety", 
-        "thyroid", "hypothyroidism", "hyperthyroidism", "gerd", "acid reflux",
-        "migraine", "allergies", "gout", "kidney disease", "liver disease",
-        "osteoporosis", "cancer", "epilepsy", "seizures", "parkinsons", 
-        "alzheimers", "celiac", "gluten", "lactose intolerance", "ibs",
-        "crohns", "colitis", "fibromyalgia", "lupus", "psoriasis", "eczema"
-    ]
-    
-    # Check for common conditions in the text
-    for condition in common_conditions:
-        if condition in text:
-            conditions.append(condition)
-    
-    # Look for patterns like "diagnosed with condition"
-    diagnosed_pattern = r"diagnos\w+\s+with\s+(\w+(\s+\w+)?)"
-    diagnosed_matches = re.findall(diagnosed_pattern, text)
-    if diagnosed_matches:
-        conditions.extend([match[0] for match in diagnosed_matches])
-    
-    # Look for patterns like "treat condition"
-    treat_pattern = r"treat\w+\s+(\w+(\s+\w+)?)"
-    treat_matches = re.findall(treat_pattern, text)
-    if treat_matches:
-        conditions.extend([match[0] for match in treat_matches])
+    if vocabulary_matches is None:
+        vocabulary_matches = scan_vocabulary(text)
+    
+    # Known conditions found in the text
+    conditions = list(vocabulary_matches["conditions"])
+    
+    # Conditions appearing in typical diagnosis phrasing
+    conditions.extend(match[0] for match in DIAGNOSED_PATTERN.findall(text))
+    conditions.extend(match[0] for match in TREAT_PATTERN.findall(text))
     
     return list(set(conditions))  # Remove duplicates
 
@@ -137,37 +210,160 @@ def extract_allergies(text):
     """
     Extract food allergies from prescription text
     """
-    allergies = []
-    
-    # Common food allergies
-    common_allergies = FoodSafetyKnowledge.ALLERGIES
-    
-    # Check for common allergies in the text
-    for allergy in common_allergies:
-        allergy_pattern = rf"allerg\w+\s+to\s+{allergy}"
-        if re.search(allergy_pattern, text) or f"allergic to {allergy}" in text:
-            allergies.append(allergy)
+    # Known food allergies mentioned as "allergic to <allergy>"
+    allergies = known_allergy_pattern().findall(text)
     
     # Look for patterns like "allergic to food"
-    allergic_pattern = r"allerg\w+\s+to\s+(\w+(\s+\w+)?)"
-    allergic_matches = re.findall(allergic_pattern, text)
-    if allergic_matches:
-        allergies.extend([match[0] for match in allergic_matches])
+    allergies.extend(match[0] for match in ALLERGIC_PATTERN.findall(text))
     
     return list(set(allergies))  # Remove duplicates
 
-def check_food_safety(food_name, food_info, restrictions):
+# Concurrent food information lookups in check_food_safety_batch
+FOOD_LOOKUP_WORKERS = int(os.environ.get("FOOD_LOOKUP_WORKERS", "8"))
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+def _stem(token):
+    """Reduce a token to a crude singular form, e.g. bananas -> banana"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith(("ches", "shes", "sses", "xes", "zes")):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+def _normalize_phrase(text):
+    """Lowercase, tokenize and stem a phrase; returns a tuple of tokens"""
+    return tuple(_stem(token) for token in WORD_PATTERN.findall(text.lower()))
+
+class RestrictionIndex:
+    """
+    Restriction profile compiled into substring and phrase indexes
+    
+    A rule fires wherever the old per-pair scan fired: when its term occurs
+    anywhere in the lowercased food name or ingredient ("milk" in
+    "buttermilk", "sodium" in "monosodium glutamate"), or, for restrictions,
+    when the ingredient occurs anywhere in the restriction. The terms are
+    indexed once (a trie for terms inside the text, a suffix array for
+    restrictions containing it), so a check costs time in the length of the
+    text rather than the number of rules. Stemmed token phrases are matched
+    as well, so plural and singular forms ("bananas", "banana") also match.
+    """
+    
+    def __init__(self, restrictions):
+        """
+        Args:
+            restrictions (dict): Output of analyze_prescription
+        """
+        # Restrictions by canonical food name, for the "directly listed" check
+        self.listed = {normalize_food_name(r) for r in restrictions.get("restrictions", [])}
+        
+        # A rule is (kind, term, medication)
+        rules = [("restriction", restriction, None) for restriction in restrictions.get("restrictions", [])]
+        for medication in restrictions.get("medications", []):
+            rules.extend(("medication", risky_food, medication) for risky_food in get_risky_foods(medication))
+        rules.extend(("allergy", allergy, None) for allergy in restrictions.get("allergies", []))
+        self.rules = list(dict.fromkeys(rules))
+        
+        # Lowercased term -> positions of its rules (several rules can share a term)
+        self.term_rules = {}
+        for position, rule in enumerate(self.rules):
+            self.term_rules.setdefault(rule[1].lower(), []).append(position)
+        terms = list(self.term_rules)
+        self.term_positions = [self.term_rules[term] for term in terms]
+        # Terms occurring in the text, and restrictions containing the text
+        self.contained_terms = ContainedTermIndex(terms)
+        self.restriction_terms = list(dict.fromkeys(rule[1].lower() for rule in self.rules if rule[0] == "restriction"))
+        self.containing_terms = ContainingTermIndex(self.restriction_terms)
+        
+        # Stemmed phrase -> rules, and restriction sub-phrase -> restrictions
+        self.contained = {}
+        self.containing = {}
+        for rule in self.rules:
+            phrase = _normalize_phrase(rule[1])
+            self._add(self.contained, phrase, rule)
+            if rule[0] == "restriction":
+                for start in range(len(phrase)):
+                    for end in range(start + 1, len(phrase) + 1):
+                        self._add(self.containing, phrase[start:end], rule)
+        
+        self.max_words = max((len(phrase) for phrase in self.contained), default=0)
+    
+    @staticmethod
+    def _add(index, phrase, rule):
+        if phrase:
+            rules = index.setdefault(phrase, [])
+            if rule not in rules:
+                rules.append(rule)
+    
+    def match(self, text, kinds=("restriction", "medication", "allergy")):
+        """
+        Find the rules that apply to a food name or ingredient
+        
+        Args:
+            text (str): Food name or ingredient
+            kinds (tuple): Rule kinds to report
+            
+        Returns:
+            list: Matching (kind, term, medication) rules, in rule order
+        """
+        lowered = text.lower()
+        positions = set()
+        for rank in self.contained_terms.all(lowered):
+            positions.update(self.term_positions[rank])
+        if "restriction" in kinds:
+            for rank in self.containing_terms.all(lowered):
+                positions.update(position for position in self.term_rules[self.restriction_terms[rank]]
+                                 if self.rules[position][0] == "restriction")
+        matched = [self.rules[position] for position in sorted(positions)]
+        
+        tokens = _normalize_phrase(text)
+        
+        def collect(rules):
+            for rule in rules:
+                if rule not in matched:
+                    matched.append(rule)
+        
+        # Stemmed phrases of the text, and restrictions containing all of it
+        for start in range(len(tokens)):
+            for end in range(start + 1, min(len(tokens), start + self.max_words) + 1):
+                collect(self.contained.get(tokens[start:end], ()))
+        if "restriction" in kinds:
+            collect(self.containing.get(tokens, ()))
+        
+        return [rule for rule in matched if rule[0] in kinds]
+
+def build_restriction_index(restrictions):
+    """
+    Compile a restriction profile for repeated food safety checks
+    
+    Args:
+        restrictions (dict): Output of analyze_prescription
+        
+    Returns:
+        RestrictionIndex: Index to pass to check_food_safety
+    """
+    return RestrictionIndex(restrictions)
+
+def check_food_safety(food_name, food_info, restrictions, restriction_index=None):
     """
     Check if a food is safe based on the user's restrictions
     Returns a dictionary with safety information
+    
+    restriction_index can be passed to reuse a profile compiled with
+    build_restriction_index when checking several foods.
     """
     try:
         is_safe = True
         unsafe_ingredients = []
         explanation = []
         
-        # Get ingredients from food info
-        ingredients = food_info.get("ingredients", [])
+        if restriction_index is None:
+            restriction_index = build_restriction_index(restrictions)
+        
+        # Get ingredients from food info (copied so food_info is not modified)
+        ingredients = list(food_info.get("ingredients", []))
         food_description = food_info.get("description", "")
         
         # If no ingredients found, try to extract from description
@@ -177,34 +373,30 @@ def check_food_safety(food_name, food_info, restrictions):
             ingredients.extend(potential_ingredients)
         
         # Check if the food name itself is in restrictions
-        if food_name.lower() in [r.lower() for r in restrictions.get("restrictions", [])]:
+        if normalize_food_name(food_name) in restriction_index.listed:
             is_safe = False
             unsafe_ingredients.append(food_name)
             explanation.append(f"{food_name} is directly listed in your restrictions.")
         
-        # Check each ingredient against restrictions
-        for ingredient in ingredients:
-            for restriction in restrictions.get("restrictions", []):
-                if restriction.lower() in ingredient.lower() or ingredient.lower() in restriction.lower():
-                    is_safe = False
-                    unsafe_ingredients.append(ingredient)
-                    explanation.append(f"{ingredient} may interact with your health condition or medication.")
+        # Medication interactions and allergies also apply to the food name itself
+        targets = [(food_name, ("medication", "allergy"))]
+        targets.extend((ingredient, ("restriction", "medication", "allergy")) for ingredient in ingredients)
         
-        # Check if any medications have specific interactions with this food
-        for medication in restrictions.get("medications", []):
-            risky_foods = FoodSafetyKnowledge.get_risky_foods_for_medication(medication)
-            for risky_food in risky_foods:
-                if risky_food.lower() in food_name.lower() or any(risky_food.lower() in ingredient.lower() for ingredient in ingredients):
-                    is_safe = False
-                    unsafe_ingredients.append(risky_food)
-                    explanation.append(f"{risky_food} may interact with your medication {medication}.")
-        
-        # Check for allergies
-        for allergy in restrictions.get("allergies", []):
-            if allergy.lower() in food_name.lower() or any(allergy.lower() in ingredient.lower() for ingredient in ingredients):
+        for target, kinds in targets:
+            for kind, term, medication in restriction_index.match(target, kinds):
                 is_safe = False
-                unsafe_ingredients.append(allergy)
-                explanation.append(f"{allergy} is listed in your allergies.")
+                if kind == "restriction":
+                    # Check each ingredient against restrictions
+                    unsafe_ingredients.append(target)
+                    explanation.append(f"{target} may interact with your health condition or medication.")
+                elif kind == "medication":
+                    # Check if any medications have specific interactions with this food
+                    unsafe_ingredients.append(term)
+                    explanation.append(f"{term} may interact with your medication {medication}.")
+                else:
+                    # Check for allergies
+                    unsafe_ingredients.append(term)
+                    explanation.append(f"{term} is listed in your allergies.")
         
         # Prepare the recommendation
         recommendation = "This food appears to be safe for you to consume." if is_safe else "This food may not be safe for you based on your prescription."
@@ -241,3 +433,38 @@ def check_food_safety(food_name, food_info, restrictions):
             "nutrients": food_info.get("nutrients", {}),
             "food_info": food_info
         }
+
+def check_food_safety_batch(food_names, restrictions, max_workers=FOOD_LOOKUP_WORKERS):
+    """
+    Check many foods against one analyzed prescription
+    
+    The restriction profile is compiled once and the food information for all
+    foods is fetched concurrently, so the cost is dominated by the food lookups.
+    
+    Args:
+        food_names (list): Food names to check
+        restrictions (dict): Output of analyze_prescription
+        max_workers (int): Maximum concurrent food information lookups
+        
+    Returns:
+        list: One check_food_safety result per food (in input order), each
+              with an added "food_name" key
+    """
+    from web_scraper import get_food_information
+    
+    restriction_index = build_restriction_index(restrictions)
+    
+    # Look each distinct food up once, in parallel ("Bananas" and "banana"
+    # are the same food)
+    food_keys = {food_name: normalize_food_name(food_name) for food_name in food_names}
+    unique_keys = list(dict.fromkeys(food_keys.values()))
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique_keys) or 1))) as pool:
+        food_infos = dict(zip(unique_keys, pool.map(get_food_information, unique_keys)))
+    
+    results = []
+    for food_name in food_names:
+        food_key = food_keys[food_name]
+        result = check_food_safety(food_key, food_infos[food_key], restrictions, restriction_index)
+        result["food_name"] = food_name
+        results.append(result)
+    return results
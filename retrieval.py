@@ -0,0 +1,216 @@
+import os
+import re
+import csv
+import glob
+import logging
+import threading
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Directory (or single file) holding the drug-food interaction corpus
+INTERACTION_CORPUS_PATH = os.environ.get(
+    "INTERACTION_CORPUS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "interactions"),
+)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "for", "from", "in", "is",
+    "it", "its", "may", "of", "on", "or", "such", "that", "the", "to", "when", "which",
+    "while", "with",
+}
+
+# Passages retrieved for a drug name that is not in the corpus must score at
+# least this fraction of the best passage
+FUZZY_MIN_SCORE_RATIO = 0.5
+
+def tokenize(text):
+    """Lowercase and split text into index terms"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+def load_corpus(path=INTERACTION_CORPUS_PATH):
+    """
+    Load interaction passages from CSV and text files
+
+    CSV files need a "passage" column and may have "drug" and "food" columns.
+    Text files (e.g. drug monographs) are split into paragraphs; the file name
+    is used as the drug.
+
+    Args:
+        path (str): A directory of .csv/.txt files, or a single file
+
+    Returns:
+        list: Passages as dicts with "drug", "food" and "text" keys
+    """
+    if os.path.isdir(path):
+        files = sorted(glob.glob(os.path.join(path, "*.csv")) + glob.glob(os.path.join(path, "*.txt")))
+    elif os.path.exists(path):
+        files = [path]
+    else:
+        logger.error(f"Interaction corpus not found at {path}")
+        return []
+
+    passages = []
+    for file_path in files:
+        with open(file_path, newline="", encoding="utf-8") as f:
+            if file_path.endswith(".csv"):
+                for row in csv.DictReader(f):
+                    text = (row.get("passage") or "").strip()
+                    if text:
+                        passages.append({
+                            "drug": (row.get("drug") or "").strip().lower(),
+                            "food": (row.get("food") or "").strip().lower(),
+                            "text": text,
+                        })
+            else:
+                drug = os.path.splitext(os.path.basename(file_path))[0].replace("_", " ").lower()
+                for paragraph in f.read().split("\n\n"):
+                    if paragraph.strip():
+                        passages.append({"drug": drug, "food": "", "text": paragraph.strip()})
+    return passages
+
+class BM25Index:
+    """
+    BM25 inverted index with vectorized top-k scoring
+
+    The postings of every term are stored as contiguous NumPy arrays of
+    document ids and precomputed BM25 impact weights, so a query is a handful
+    of vectorized scatter-adds followed by an argpartition, independent of
+    Python-level loops over documents.
+    """
+
+    def __init__(self, passages, k1=1.2, b=0.75):
+        """
+        Args:
+            passages (list): Dicts with at least a "text" key (see load_corpus)
+            k1 (float): BM25 term-frequency saturation
+            b (float): BM25 length normalization
+        """
+        self.passages = passages
+        self.vocabulary = {}
+
+        # Exact drug name -> interacting foods, in corpus order
+        self.drug_foods = {}
+        for passage in passages:
+            if passage.get("drug") and passage.get("food"):
+                drug_foods = self.drug_foods.setdefault(passage["drug"], [])
+                if passage["food"] not in drug_foods:
+                    drug_foods.append(passage["food"])
+
+        # Collect (term, doc, tf) triples
+        term_ids, doc_ids, term_freqs = [], [], []
+        doc_lengths = np.zeros(len(passages), dtype=np.float32)
+        for doc_id, passage in enumerate(passages):
+            tokens = tokenize(passage.get("drug", "") + " " + passage.get("food", "") + " " + passage["text"])
+            doc_lengths[doc_id] = len(tokens)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                term_ids.append(self.vocabulary.setdefault(token, len(self.vocabulary)))
+                doc_ids.append(doc_id)
+                term_freqs.append(count)
+
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        term_freqs = np.asarray(term_freqs, dtype=np.float32)
+
+        # Group postings by term (CSR layout): postings of term t are [offsets[t], offsets[t + 1])
+        order = np.argsort(term_ids, kind="stable")
+        self.doc_ids = doc_ids[order]
+        doc_freqs = np.bincount(term_ids, minlength=len(self.vocabulary))
+        self.offsets = np.concatenate(([0], np.cumsum(doc_freqs)))
+
+        # Precompute BM25 impact of every posting
+        n_docs = max(len(passages), 1)
+        avg_length = float(doc_lengths.mean()) if len(passages) else 1.0
+        idf = np.log(1.0 + (n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        tf = term_freqs[order]
+        length_norm = k1 * (1.0 - b + b * doc_lengths[self.doc_ids] / max(avg_length, 1.0))
+        self.weights = idf[term_ids[order]] * tf * (k1 + 1.0) / (tf + length_norm)
+
+    def search(self, query, k=10, min_score_ratio=None):
+        """
+        Return the top-k passages for a query
+
+        Args:
+            query (str): Free-text query
+            k (int): Number of results (None for every passage that scores)
+            min_score_ratio (float, optional): Only return passages scoring at
+                least this fraction of the best one
+
+        Returns:
+            list: (score, passage) pairs, best first
+        """
+        scores = np.zeros(len(self.passages), dtype=np.float32)
+        for token in set(tokenize(query)):
+            term_id = self.vocabulary.get(token)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            # Doc ids are unique within a posting list, so fancy-index add is safe
+            scores[self.doc_ids[start:end]] += self.weights[start:end]
+
+        candidates = np.flatnonzero(scores)
+        if candidates.size == 0:
+            return []
+        if min_score_ratio is not None:
+            candidates = candidates[scores[candidates] >= scores[candidates].max() * min_score_ratio]
+        if k is not None and candidates.size > k:
+            candidates = candidates[np.argpartition(scores[candidates], -k)[-k:]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(float(scores[i]), self.passages[i]) for i in candidates]
+
+    def interacting_foods(self, drugs, min_score_ratio=FUZZY_MIN_SCORE_RATIO):
+        """
+        Find foods that interact with any of the given drugs
+
+        Drugs named exactly as in the corpus are answered from the drug ->
+        foods map built with the index, with every food the corpus lists.
+        Other names ("warfarin sodium tablets") go through BM25: passages
+        scoring at least min_score_ratio of the best one are kept when their
+        drug field and the name share all the words of the shorter one, so
+        loosely related passages do not add restrictions.
+
+        Args:
+            drugs (list): Drug (or drug class) names
+            min_score_ratio (float): Score cut-off for BM25 matches, relative to the best
+
+        Returns:
+            dict: Drug -> list of interacting foods
+        """
+        foods = {}
+        for drug in drugs:
+            drug = drug.lower().strip()
+            if not drug:
+                continue
+            if drug in self.drug_foods:
+                foods[drug] = list(self.drug_foods[drug])
+                continue
+
+            query_tokens = set(tokenize(drug))
+            for score, passage in self.search(drug, k=None, min_score_ratio=min_score_ratio):
+                passage_tokens = set(tokenize(passage.get("drug", "")))
+                if (passage.get("food") and passage_tokens
+                        and (passage_tokens <= query_tokens or query_tokens <= passage_tokens)):
+                    drug_foods = foods.setdefault(drug, [])
+                    if passage["food"] not in drug_foods:
+                        drug_foods.append(passage["food"])
+        return foods
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_interaction_index():
+    """Returns the interaction index, building it from INTERACTION_CORPUS_PATH on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            passages = load_corpus()
+            _index = BM25Index(passages)
+            logger.debug(f"Indexed {len(passages)} interaction passages ({len(_index.vocabulary)} terms)")
+        return _index
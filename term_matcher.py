@@ -0,0 +1,212 @@
+import re
+from bisect import bisect_left
+
+def trie_pattern(terms):
+    """
+    Build a prefix-factored regex alternation for a list of terms
+
+    A flat "a|b|c" alternation makes the regex engine try every term at every
+    position; factoring common prefixes into a trie means each position only
+    follows the branches that actually match, so scanning stays roughly linear
+    in the text length as the vocabulary grows.
+
+    Args:
+        terms (iterable): Literal strings
+
+    Returns:
+        str: Regex source (without boundaries) matching any of the terms
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = True  # end-of-term marker
+
+    def build(node):
+        branches = []
+        optional = False
+        for char in sorted(node):
+            if char == "":
+                optional = True
+                continue
+            branches.append(re.escape(char) + build(node[char]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if optional:
+            # The term may end here; the greedy "?" still prefers the longer match
+            body = "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+        return body
+
+    return build(trie)
+
+class TermMatcher:
+    """
+    Single-pass matcher for several vocabularies at once
+
+    All terms are compiled once into one trie-shaped regular expression with
+    word boundaries. find() scans the text a single time and reports which
+    terms of which vocabulary occur in it.
+    """
+
+    def __init__(self, vocabularies):
+        """
+        Args:
+            vocabularies (dict): Vocabulary name -> list of lowercase terms.
+                A term may appear in several vocabularies.
+        """
+        self.vocabularies = list(vocabularies)
+        self._kinds = {}
+        for kind, terms in vocabularies.items():
+            for term in terms:
+                self._kinds.setdefault(term.lower(), []).append(kind)
+        if self._kinds:
+            self._pattern = re.compile(r"\b(?:" + trie_pattern(self._kinds) + r")\b")
+        else:
+            self._pattern = None
+
+    def find(self, text):
+        """
+        Find every vocabulary term in the text
+
+        Args:
+            text (str): Lowercased text to scan
+
+        Returns:
+            dict: Vocabulary name -> list of matched terms (deduplicated, in order of first occurrence)
+        """
+        found = {kind: {} for kind in self.vocabularies}
+        if self._pattern is not None:
+            for match in self._pattern.finditer(text):
+                term = match.group(0)
+                for kind in self._kinds[term]:
+                    found[kind][term] = True
+        return {kind: list(terms) for kind, terms in found.items()}
+
+class ContainedTermIndex:
+    """
+    Finds which terms occur as substrings of a text
+
+    Terms are stored in a character trie; a lookup walks the trie from every
+    position of the text, so its cost depends on the text length and the
+    longest term, not on the number of terms. Every term has a rank (its
+    position in the input unless given), and lookups return the best-ranked
+    match, mirroring a first-match scan over the terms in order.
+    """
+
+    def __init__(self, terms):
+        """
+        Args:
+            terms (iterable): Terms, or (term, rank) pairs; lower ranks win
+        """
+        self.trie = {}
+        for rank, term in enumerate(terms):
+            if isinstance(term, tuple):
+                term, rank = term
+            node = self.trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = min(rank, node.get("", rank))
+
+    def best(self, text):
+        """
+        Returns the best rank of any term contained in the text, or None
+
+        Args:
+            text (str): Text to search (terms are matched case-sensitively)
+        """
+        best = None
+        for start in range(len(text)):
+            node = self.trie
+            for i in range(start, len(text)):
+                node = node.get(text[i])
+                if node is None:
+                    break
+                rank = node.get("")
+                if rank is not None and (best is None or rank < best):
+                    best = rank
+        if best is None and "" in self.trie:
+            best = self.trie[""]
+        return best
+
+    def all(self, text):
+        """
+        Returns the ranks of every term contained in the text
+
+        Args:
+            text (str): Text to search
+
+        Returns:
+            set: Ranks of the contained terms
+        """
+        found = set()
+        if "" in self.trie:
+            found.add(self.trie[""])
+        for start in range(len(text)):
+            node = self.trie
+            for i in range(start, len(text)):
+                node = node.get(text[i])
+                if node is None:
+                    break
+                if "" in node:
+                    found.add(node[""])
+        return found
+
+class ContainingTermIndex:
+    """
+    Finds the terms that contain a text as a substring
+
+    A generalized suffix array over all terms: the suffixes containing the
+    text as a prefix form one contiguous range (found by binary search), and
+    a sparse table answers "best rank in that range" in constant time. A
+    lookup costs O(len(text) * log(total term length)).
+    """
+
+    def __init__(self, terms):
+        """
+        Args:
+            terms (list): Terms in rank order (the first term ranks best)
+        """
+        suffixes = sorted(
+            (term[start:], rank) for rank, term in enumerate(terms) for start in range(len(term) + 1)
+        )
+        self.suffixes = [suffix for suffix, _ in suffixes]
+        ranks = [rank for _, rank in suffixes]
+
+        # table[k][i] = best rank among ranks[i:i + 2 ** k]
+        self.table = [ranks]
+        width = 1
+        while width * 2 <= len(ranks):
+            previous = self.table[-1]
+            self.table.append([min(previous[i], previous[i + width]) for i in range(len(ranks) - 2 * width + 1)])
+            width *= 2
+
+    def best(self, text):
+        """
+        Returns the best rank of any term containing the text, or None
+
+        Args:
+            text (str): Text to look for
+        """
+        lo = bisect_left(self.suffixes, text)
+        hi = bisect_left(self.suffixes, text + "\U0010ffff", lo)
+        if lo >= hi:
+            return None
+        level = (hi - lo).bit_length() - 1
+        row = self.table[level]
+        return min(row[lo], row[hi - (1 << level)])
+
+    def all(self, text):
+        """
+        Returns the ranks of every term containing the text
+
+        Args:
+            text (str): Text to look for
+
+        Returns:
+            set: Ranks of the containing terms
+        """
+        lo = bisect_left(self.suffixes, text)
+        hi = bisect_left(self.suffixes, text + "\U0010ffff", lo)
+        return set(self.table[0][lo:hi])
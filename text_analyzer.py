@@ -0,0 +1,168 @@
+import re
+from bisect import bisect_right
+from term_matcher import trie_pattern
+
+# Patterns that pull phrases out of article text. Each one starts with one of
+# its trigger keywords; the captured phrase never crosses a ".".
+INGREDIENT_PATTERNS = [
+    (["ingredients", "contains"], r"(?:ingredients|contains):([^\.]+)"),
+    (["made from", "composed of"], r"(?:made from|composed of):([^\.]+)"),
+    (["ingredients include", "contains"], r"(?:ingredients include|contains):([^\.]+)"),
+]
+
+BENEFIT_PATTERNS = [
+    (["benefit", "benefits", "good for", "helps with", "rich in", "source of"],
+     r"(?:benefit|benefits|good for|helps with|rich in|source of)([^\.]+)"),
+    (["high in", "contains", "provides"],
+     r"(?:high in|contains|provides)([^\.]+vitamins|minerals|antioxidants|protein|fiber)"),
+    (["may", "can", "could"],
+     r"(?:may|can|could)([^\.]+reduce|prevent|improve|enhance|boost)"),
+    (["promotes", "supports", "aids"],
+     r"(?:promotes|supports|aids)([^\.]+health|function|growth|recovery)"),
+]
+
+RISK_PATTERNS = [
+    (["risk", "risks", "harmful", "danger", "caution", "warning"],
+     r"(?:risk|risks|harmful|danger|caution|warning)([^\.]+)"),
+    (["high in", "excessive", "too much"],
+     r"(?:high in|excessive|too much)([^\.]+sugar|salt|fat|cholesterol|calories)"),
+    (["may", "can", "could"],
+     r"(?:may|can|could)([^\.]+cause|lead to|result in|trigger|worsen)"),
+    (["avoid", "limit", "reduce"],
+     r"(?:avoid|limit|reduce)([^\.]+consumption|intake)"),
+]
+
+# Looked for when the text has no explicit ingredient list
+COMMON_INGREDIENTS = [
+    "salt", "sugar", "water", "flour", "rice", "wheat", "corn", "dairy",
+    "milk", "eggs", "soy", "nuts", "peanuts", "fish", "shellfish",
+    "gluten", "vegetable oil", "butter", "cheese",
+]
+
+HEDGE_PREFIXES = ('be ', 'is ', 'are ', 'may ', 'can ')
+
+SEGMENT_END = re.compile(r"\.")
+
+class TextAnalyzer:
+    """
+    Extracts ingredients, benefits, risks and a description from article text
+
+    All patterns are compiled once. A single scan of the lowercased text
+    finds every trigger keyword (overlapping occurrences included) and the
+    "."-delimited segment it falls in; each pattern then only runs on the
+    segments that contain one of its triggers. Because no pattern can match
+    across a ".", this finds exactly the matches of running every pattern
+    over the whole text.
+    """
+
+    def __init__(self):
+        self.rules = []  # (kind, compiled pattern)
+        triggers = {}
+        for kind, patterns in (("ingredients", INGREDIENT_PATTERNS),
+                               ("benefits", BENEFIT_PATTERNS),
+                               ("risks", RISK_PATTERNS)):
+            for keywords, pattern in patterns:
+                rule_id = len(self.rules)
+                self.rules.append((kind, re.compile(pattern, re.IGNORECASE)))
+                for keyword in keywords:
+                    triggers.setdefault(keyword, set()).add(rule_id)
+
+        # The trie regex reports the longest keyword at each position, so a
+        # keyword also fires the rules of every shorter keyword it starts with
+        self.trigger_rules = {
+            keyword: frozenset().union(*(rules for other, rules in triggers.items() if keyword.startswith(other)))
+            for keyword in triggers
+        }
+        self.trigger_pattern = re.compile("(?=(" + trie_pattern(triggers) + "))")
+
+    def _segment_rules(self, text, lowered):
+        """
+        Segment boundaries and the rules triggered in each segment
+
+        Returns:
+            tuple: (segment start offsets, {segment index: set of rule ids}),
+                   or None if lowercasing changed the text length
+        """
+        if len(lowered) != len(text):
+            return None
+        starts = [0] + [match.end() for match in SEGMENT_END.finditer(text)]
+        triggered = {}
+        for match in self.trigger_pattern.finditer(lowered):
+            segment = bisect_right(starts, match.start()) - 1
+            triggered.setdefault(segment, set()).update(self.trigger_rules[match.group(1)])
+        return starts, triggered
+
+    def _matches(self, text, lowered):
+        """Yield (kind, captured phrase) in text order for every rule"""
+        segments = self._segment_rules(text, lowered)
+        if segments is None:
+            for kind, pattern in self.rules:
+                for match in pattern.findall(text):
+                    yield kind, match
+            return
+
+        starts, triggered = segments
+        for segment in sorted(triggered):
+            start = starts[segment]
+            end = starts[segment + 1] if segment + 1 < len(starts) else len(text)
+            for rule_id in sorted(triggered[segment]):
+                kind, pattern = self.rules[rule_id]
+                for match in pattern.findall(text, start, end):
+                    yield kind, match
+
+    @staticmethod
+    def _phrase(match):
+        """Benefit/risk phrase as shown to the user, or None if it is too short or long"""
+        phrase = match.strip()
+        if not 5 < len(phrase) < 100:  # Avoid too short or too long matches
+            return None
+        return f"May {phrase}" if not phrase.lower().startswith(HEDGE_PREFIXES) else phrase
+
+    def analyze(self, text):
+        """
+        Analyze article text in one pass
+
+        Args:
+            text (str): Article text
+
+        Returns:
+            dict: "ingredients", "benefits" and "risks" (lists, deduplicated,
+                  in text order) and "description" (first paragraph)
+        """
+        lowered = text.lower()
+        found = {"ingredients": {}, "benefits": {}, "risks": {}}
+        for kind, match in self._matches(text, lowered):
+            if kind == "ingredients":
+                for item in match.split(','):
+                    found["ingredients"][item.strip().lower()] = True
+            else:
+                phrase = self._phrase(match)
+                if phrase:
+                    found[kind][phrase] = True
+
+        ingredients = list(found["ingredients"])
+        if not ingredients:
+            ingredients = [ingredient for ingredient in COMMON_INGREDIENTS if ingredient in lowered]
+
+        return {
+            "ingredients": ingredients,
+            "benefits": list(found["benefits"]),
+            "risks": list(found["risks"]),
+            "description": describe(text),
+        }
+
+def describe(text):
+    """Brief description: the first paragraph of the text"""
+    # Simplistic approach: take the first paragraph
+    paragraphs = text.split('\n\n')
+    if paragraphs:
+        return paragraphs[0]
+
+    # Fallback to the first 200 characters
+    return text[:200] + "..."
+
+_analyzer = TextAnalyzer()
+
+def analyze_text(text):
+    """Ingredients, benefits, risks and description of a text (see TextAnalyzer.analyze)"""
+    return _analyzer.analyze(text)
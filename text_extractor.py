@@ -1,51 +1,101 @@
 import os
 import logging
-import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import PyPDF2
 import io
-from transformers import TrOCRProcessor, VisionEncoderDecoderModel
-import torch
+from model_registry import get_trocr, TROCR_MODEL_NAME, TROCR_BACKEND
+from line_segmenter import segment_lines
+from ocr_server import get_ocr_server
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Load TrOCR model and processor globally for reuse
-try:
-    logger.debug("Loading TrOCR model...")
-    processor = TrOCRProcessor.from_pretrained("microsoft/trocr-base-handwritten")
-    model = VisionEncoderDecoderModel.from_pretrained("microsoft/trocr-base-handwritten")
-    TROCR_AVAILABLE = True
-    logger.debug("TrOCR model loaded successfully")
-except Exception as e:
-    logger.error(f"Error loading TrOCR model: {str(e)}")
-    TROCR_AVAILABLE = False
+# Identifies the extraction pipeline in cache keys. Bump it whenever a change
+# here would produce different text for the same file, so stale results are not served.
+EXTRACTOR_VERSION = f"lines-v2:{TROCR_MODEL_NAME}:{TROCR_BACKEND}"
+
+# Number of line crops decoded together in one model.generate call.
+# Larger batches amortize the encoder/decoder overhead but need more memory.
+TROCR_BATCH_SIZE = int(os.environ.get("TROCR_BATCH_SIZE", "8"))
+
+# Upper bound on generated tokens per line; a handwritten line is short
+TROCR_MAX_NEW_TOKENS = int(os.environ.get("TROCR_MAX_NEW_TOKENS", "64"))
+
+# Maximum number of PDF pages OCRed at the same time. The pool is shared by all
+# requests in the worker, so this also bounds OCR concurrency per process.
+OCR_PAGE_WORKERS = int(os.environ.get("OCR_PAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Pages whose text layer has fewer characters than this are OCRed instead
+MIN_PAGE_TEXT_LENGTH = 25
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+def recognize_lines(line_images, batch_size=None, trocr=None):
+    """
+    Run TrOCR over a list of single-line images in batches
+
+    Args:
+        line_images (list): PIL images, each containing one line of text
+        batch_size (int, optional): Crops per model.generate call
+        trocr (tuple, optional): (processor, model) to use instead of the
+            registry's model, e.g. to compare inference backends
+
+    Returns:
+        list: Recognized text for each crop, in the same order
+    """
+    processor, model = trocr or get_trocr()
+    if model is None:
+        logger.error("TrOCR model not available")
+        return []
+
+    import torch
+
+    batch_size = max(1, batch_size or TROCR_BATCH_SIZE)
+    texts = []
+    with torch.inference_mode():
+        for start in range(0, len(line_images), batch_size):
+            batch = line_images[start:start + batch_size]
+            pixel_values = processor(images=batch, return_tensors="pt").pixel_values
+            generated_ids = model.generate(pixel_values, max_new_tokens=TROCR_MAX_NEW_TOKENS)
+            texts.extend(processor.batch_decode(generated_ids, skip_special_tokens=True))
+    return texts
 
 def extract_text_from_image(image_path):
     """
     Extract text from an image file using TrOCR
     
+    The page is split into text lines first, since TrOCR only reads one line
+    at a time, and the lines are recognized in batches by the OCR server.
+    
     Args:
-        image_path (str): Path to the image file
+        image_path (str or PIL.Image.Image): Path to the image file, or an
+            already-loaded image (e.g. a rendered PDF page)
         
     Returns:
-        str: Extracted text from the image
+        str: Extracted text from the image, one line per recognized text line
     """
     try:
-        if not TROCR_AVAILABLE:
+        # The model is loaded on first use (or by the warm-up thread)
+        processor, model = get_trocr()
+        if model is None:
             logger.error("TrOCR model not available")
             return ""
             
-        # Open the image
-        image = Image.open(image_path).convert("RGB")
-        
-        # Process image with TrOCR
-        pixel_values = processor(images=image, return_tensors="pt").pixel_values
+        # Open the image unless we were handed one
+        if isinstance(image_path, Image.Image):
+            image = image_path.convert("RGB")
+        else:
+            image = Image.open(image_path).convert("RGB")
         
-        # Generate text
-        generated_ids = model.generate(pixel_values)
-        text = processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
+        # Split the page into lines; the shared OCR server batches them
+        # together with crops from other pages and concurrent requests
+        lines = segment_lines(image)
+        line_texts = get_ocr_server().recognize(lines)
+        text = "\n".join(line.strip() for line in line_texts if line.strip())
         
         logger.debug(f"Extracted text from image using TrOCR: {text[:100]}...")
         return text
@@ -58,6 +108,9 @@ def extract_text_from_pdf(pdf_path):
     """
     Extract text from a PDF file using PyPDF2
     
+    Each page is handled on its own: pages with a usable text layer keep their
+    PyPDF2 text, and only pages without one (scanned pages) are rendered and OCRed.
+    
     Args:
         pdf_path (str): Path to the PDF file
         
@@ -71,34 +124,85 @@ def extract_text_from_pdf(pdf_path):
             pdf_reader = PyPDF2.PdfReader(file)
             
             # Extract text from each page
-            text = ""
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text()
-        
-        # If extracted text is very short or empty, it might be a scanned PDF
-        if len(text.strip()) < 50:
-            logger.debug("Limited text extracted directly. PDF may be scanned. Attempting OCR...")
-            return extract_text_from_pdf_using_ocr(pdf_path)
-            
-        logger.debug(f"Extracted text from PDF: {text[:100]}...")
-        return text
+            page_texts = []
+            for page_num, page in enumerate(pdf_reader.pages, 1):
+                try:
+                    page_texts.append(page.extract_text() or "")
+                except Exception as e:
+                    logger.error(f"Error extracting text from PDF page {page_num}: {str(e)}")
+                    page_texts.append("")
     
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
         
-        # Try OCR as fallback for scanned PDFs
+        # The PDF could not be parsed at all; try OCR on the whole document
         try:
             logger.debug("Attempting OCR fallback for PDF...")
             return extract_text_from_pdf_using_ocr(pdf_path)
         except Exception as ocr_error:
             logger.error(f"OCR fallback failed: {str(ocr_error)}")
             return ""
+    
+    # Pages with little or no text layer are probably scanned
+    scanned_pages = [page_num for page_num, page_text in enumerate(page_texts, 1)
+                     if len(page_text.strip()) < MIN_PAGE_TEXT_LENGTH]
+    if scanned_pages:
+        logger.debug(f"Limited text on pages {scanned_pages} of {len(page_texts)}. Attempting OCR...")
+        for page_num, ocr_text in zip(scanned_pages, ocr_pdf_pages(pdf_path, scanned_pages)):
+            # Keep a short text layer ("Rx: warfarin 5mg") unless OCR found more;
+            # OCR returns "" when the model or poppler is unavailable
+            if ocr_text and len(ocr_text.strip()) > len(page_texts[page_num - 1].strip()):
+                page_texts[page_num - 1] = ocr_text
+    
+    text = "\n\n".join(page_text for page_text in page_texts if page_text.strip())
+    logger.debug(f"Extracted text from PDF: {text[:100]}...")
+    return text
+
+def _get_page_pool():
+    """Returns the shared worker pool used to OCR PDF pages, creating it on first use"""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ThreadPoolExecutor(max_workers=OCR_PAGE_WORKERS, thread_name_prefix="ocr-page")
+        return _page_pool
+
+def _ocr_page(page_number, image):
+    """OCR a single rendered PDF page (runs on the page pool)"""
+    logger.debug(f"Processing page {page_number} with TrOCR")
+    return extract_text_from_image(image)
+
+def _render_and_ocr_page(pdf_path, page_number):
+    """Render a single PDF page in memory and OCR it (runs on the page pool)"""
+    try:
+        from pdf2image import convert_from_path
+        
+        images = convert_from_path(pdf_path, first_page=page_number, last_page=page_number)
+        return _ocr_page(page_number, images[0]) if images else ""
+    except Exception as e:
+        logger.error(f"Error using OCR on PDF page {page_number}: {str(e)}")
+        return ""
+
+def ocr_pdf_pages(pdf_path, page_numbers):
+    """
+    OCR selected pages of a PDF concurrently
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        page_numbers (list): 1-based page numbers to render and OCR
+        
+    Returns:
+        list: Extracted text for each requested page, in the same order
+    """
+    pool = _get_page_pool()
+    return list(pool.map(lambda page_number: _render_and_ocr_page(pdf_path, page_number), page_numbers))
 
 def extract_text_from_pdf_using_ocr(pdf_path):
     """
     Extract text from a PDF using OCR (for scanned PDFs)
     
+    Pages are rendered in memory and recognized concurrently on a bounded
+    worker pool; the text is reassembled in page order.
+    
     Args:
         pdf_path (str): Path to the PDF file
         
@@ -108,29 +212,15 @@ def extract_text_from_pdf_using_ocr(pdf_path):
     try:
         from pdf2image import convert_from_path
         
-        # Convert PDF to images
-        images = convert_from_path(pdf_path)
+        # Convert PDF to images (kept in memory, no temporary files)
+        images = convert_from_path(pdf_path, thread_count=OCR_PAGE_WORKERS)
         
-        # Extract text from each image
-        text = ""
-        for i, image in enumerate(images):
-            # Create a temporary file to save the image
-            with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as temp_file:
-                temp_filename = temp_file.name
-                
-            # Save the image
-            image.save(temp_filename, 'JPEG')
-            
-            # Extract text from the image
-            logger.debug(f"Processing page {i+1} with TrOCR")
-            page_text = extract_text_from_image(temp_filename)
-            text += page_text + "\n\n"
-            
-            # Remove the temporary file
-            os.unlink(temp_filename)
+        # Extract text from every page in parallel; map() keeps page order
+        pool = _get_page_pool()
+        page_texts = pool.map(_ocr_page, range(1, len(images) + 1), images)
         
-        return text
+        return "".join(page_text + "\n\n" for page_text in page_texts)
     
     except Exception as e:
         logger.error(f"Error using OCR on PDF: {str(e)}")
-        return ""
\ No newline at end of file
+        return ""
@@ -0,0 +1,126 @@
+"""
+Cache warm-up for the most requested foods
+
+Looks foods up ahead of traffic so that a freshly deployed node (or one
+whose cache was flushed) serves popular foods from the food information
+cache right away. Foods come from the command line, from files with one
+food per line, or from the top-N "Food request:" lines of the app logs.
+
+Usage:
+    python warm_cache.py banana milk "peanut butter"
+    python warm_cache.py --file foods.txt --concurrency 8
+    python warm_cache.py --log /var/log/healthy/app.log --top 200 [--refresh]
+"""
+import re
+import sys
+import time
+import argparse
+import statistics
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from food_names import normalize_food_name
+from web_scraper import get_food_cache
+
+# Written by app.py for every food checked
+FOOD_REQUEST_PATTERN = re.compile(r"Food request: (.+?)\s*$")
+
+def read_food_file(path):
+    """Food names from a text file, one per line (blank lines and # comments skipped)"""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+def top_logged_foods(paths, top):
+    """
+    Most requested foods in app log files
+
+    Args:
+        paths (list): Log files
+        top (int): Number of foods to return
+
+    Returns:
+        list: Canonical food names, most requested first
+    """
+    counts = Counter()
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                match = FOOD_REQUEST_PATTERN.search(line)
+                if match:
+                    counts[normalize_food_name(match.group(1))] += 1
+    return [food for food, _ in counts.most_common(top)]
+
+def warm(food_names, concurrency=4, refresh=False, out=sys.stdout):
+    """
+    Look foods up in parallel to populate the food information cache
+
+    Args:
+        food_names (list): Food names (canonicalized and deduplicated here)
+        concurrency (int): Maximum lookups in flight
+        refresh (bool): Fetch even foods that already have a fresh entry
+        out (file): Where progress is reported
+
+    Returns:
+        dict: Timing summary (foods, failures, seconds, p50_ms, p95_ms, sources)
+    """
+    keys = list(dict.fromkeys(normalize_food_name(name) for name in food_names))
+    cache = get_food_cache()
+    lookup = cache.refresh if refresh else cache.get
+
+    def timed(key):
+        start = time.perf_counter()
+        info = lookup(key)
+        return info, (time.perf_counter() - start) * 1000
+
+    timings, sources, failures = [], Counter(), 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {pool.submit(timed, key): key for key in keys}
+        for done, future in enumerate(as_completed(futures), start=1):
+            key = futures[future]
+            try:
+                info, elapsed = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"[{done}/{len(keys)}] {key}: failed ({str(e)})", file=out)
+                continue
+            timings.append(elapsed)
+            sources[info.get("source")] += 1
+            print(f"[{done}/{len(keys)}] {key}: {info.get('source')} in {elapsed:.0f} ms", file=out)
+
+    timings.sort()
+    return {
+        "foods": len(keys),
+        "failures": failures,
+        "seconds": round(time.perf_counter() - start, 2),
+        "p50_ms": round(statistics.median(timings), 1) if timings else 0.0,
+        "p95_ms": round(timings[int(0.95 * (len(timings) - 1))], 1) if timings else 0.0,
+        "sources": dict(sources),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-populate the food information cache")
+    parser.add_argument("foods", nargs="*", help="food names")
+    parser.add_argument("--file", action="append", default=[], help="file with one food per line")
+    parser.add_argument("--log", action="append", default=[], help="app log file to take the top foods from")
+    parser.add_argument("--top", type=int, default=100, help="number of logged foods to warm")
+    parser.add_argument("--concurrency", type=int, default=4, help="maximum lookups in flight")
+    parser.add_argument("--refresh", action="store_true", help="refetch foods that are already cached")
+    args = parser.parse_args()
+
+    food_names = list(args.foods)
+    for path in args.file:
+        food_names.extend(read_food_file(path))
+    if args.log:
+        food_names.extend(top_logged_foods(args.log, args.top))
+    if not food_names:
+        parser.error("no foods given (pass names, --file or --log)")
+
+    summary = warm(food_names, args.concurrency, args.refresh)
+    print(f"Warmed {summary['foods'] - summary['failures']}/{summary['foods']} foods in {summary['seconds']} s "
+          f"(p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms); sources: {summary['sources']}")
+    print(f"Cache: {get_food_cache().stats()}")
+    sys.exit(1 if summary["failures"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import os
+import re
+import time
+import logging
+import threading
+from html import unescape
+from html.parser import HTMLParser
+from http_client import get_client
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Bytes of article HTML read at most; longer articles are cut, which only
+# loses their last sections (the lead always comes first)
+WIKIPEDIA_MAX_BYTES = int(os.environ.get("WIKIPEDIA_MAX_BYTES", str(1536 * 1024)))
+
+# Sections kept besides the lead: those whose heading contains one of these
+WIKIPEDIA_SECTION_KEYWORDS = (
+    "nutrition", "nutrient", "composition", "ingredient",
+    "health", "effects", "safety", "toxicity", "allerg", "risk",
+)
+
+# Level 2 and 3 headings, in old (<h2><span class="mw-headline">) and
+# new (<div class="mw-heading"><h2>) article markup alike
+HEADING_PATTERN = re.compile(r"<h([23])\b[^>]*>(.*?)</h\1\s*>", re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r"<[^>]+>")
+CONTENT_START_PATTERN = re.compile(r"""id=["']mw-content-text["']""")
+
+class _ParagraphParser(HTMLParser):
+    """Collects the text of <p> and <li> elements, leaving out tables, references and styles"""
+
+    BLOCKS = {"p", "li"}
+    SKIPPED = {"table", "style", "script", "sup", "figure", "math"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs = []
+        self._parts = None
+        self._block_depth = 0
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED:
+            self._skip_depth += 1
+        elif tag in self.BLOCKS:
+            if self._block_depth == 0:
+                self._parts = []
+            self._block_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in self.BLOCKS and self._block_depth:
+            self._block_depth -= 1
+            if self._block_depth == 0:
+                text = " ".join("".join(self._parts).split())
+                if text:
+                    self.paragraphs.append(text)
+                self._parts = None
+
+    def handle_data(self, data):
+        if self._block_depth and not self._skip_depth:
+            self._parts.append(data)
+
+    def feed_fragment(self, html):
+        """Parse a self-contained fragment; elements it leaves open are dropped"""
+        self.feed(html)
+        self.close()
+        self.reset()
+        self._parts = None
+        self._block_depth = self._skip_depth = 0
+
+def _heading_text(heading_html):
+    return " ".join(unescape(TAG_PATTERN.sub("", heading_html)).split())
+
+def select_sections(html, keywords=WIKIPEDIA_SECTION_KEYWORDS):
+    """
+    Cut a Wikipedia article down to its lead and the sections we analyze
+
+    Headings are located with one regex scan; only the HTML of the lead and
+    of the sections whose heading contains a keyword (with their
+    subsections) is kept for parsing.
+
+    Args:
+        html (str): Article HTML (possibly truncated)
+        keywords (tuple): Lowercase heading keywords
+
+    Returns:
+        tuple: (list of HTML fragments, list of kept section headings)
+    """
+    start = CONTENT_START_PATTERN.search(html)
+    position = start.end() if start else 0
+    fragments, headings = [], []
+    keep, keep_parent = True, False  # the lead is kept
+    for match in HEADING_PATTERN.finditer(html, position):
+        if keep:
+            fragments.append(html[position:match.start()])
+        heading = _heading_text(match.group(2))
+        matched = any(keyword in heading.lower() for keyword in keywords)
+        if match.group(1) == "2":
+            keep = keep_parent = matched
+        else:
+            keep = matched or keep_parent
+        if keep:
+            headings.append(heading)
+        position = match.end()
+    if keep:
+        fragments.append(html[position:])
+    return fragments, headings
+
+def extract_sections(html, keywords=WIKIPEDIA_SECTION_KEYWORDS):
+    """
+    Text of the lead and the kept sections of a Wikipedia article
+
+    Returns:
+        tuple: (text with one paragraph per block, list of kept section headings)
+    """
+    fragments, headings = select_sections(html, keywords)
+    parser = _ParagraphParser()
+    for fragment in fragments:
+        parser.feed_fragment(fragment)
+    return "\n\n".join(parser.paragraphs), headings
+
+class ExtractionStats:
+    """Byte and CPU-time counters of the Wikipedia extractions"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {"extractions": 0, "truncated": 0, "bytes": 0, "max_bytes": 0,
+                         "cpu_ms": 0.0, "max_cpu_ms": 0.0}
+
+    def record(self, size, truncated, cpu_ms):
+        with self._lock:
+            counters = self.counters
+            counters["extractions"] += 1
+            counters["truncated"] += int(truncated)
+            counters["bytes"] += size
+            counters["max_bytes"] = max(counters["max_bytes"], size)
+            counters["cpu_ms"] += cpu_ms
+            counters["max_cpu_ms"] = max(counters["max_cpu_ms"], cpu_ms)
+
+    def stats(self):
+        """
+        Returns:
+            dict: extractions, truncated, avg_bytes, max_bytes, avg_cpu_ms and max_cpu_ms
+        """
+        with self._lock:
+            counters = dict(self.counters)
+        count = counters["extractions"] or 1
+        return {
+            "extractions": counters["extractions"],
+            "truncated": counters["truncated"],
+            "avg_bytes": counters.pop("bytes") // count,
+            "max_bytes": counters["max_bytes"],
+            "avg_cpu_ms": round(counters.pop("cpu_ms") / count, 2),
+            "max_cpu_ms": round(counters["max_cpu_ms"], 2),
+        }
+
+extraction_stats = ExtractionStats()
+
+def fetch_article_text(url, timeout=None, max_bytes=WIKIPEDIA_MAX_BYTES, retries=None):
+    """
+    Fetch a Wikipedia article and return the text of its lead and relevant sections
+
+    The response is streamed and cut at max_bytes; the bytes read and the
+    CPU time of the extraction are logged and added to extraction_stats.
+
+    Args:
+        url (str): Article URL
+        timeout (tuple, optional): (connect, read) timeout
+        max_bytes (int): Bytes read at most
+        retries (int, optional): Retries overriding the client default
+
+    Returns:
+        str: Extracted text (empty if the article could not be fetched)
+    """
+    response = get_client().get(url, timeout=timeout, max_bytes=max_bytes, truncate=True, retries=retries)
+    if response.status_code != 200:
+        return ""
+
+    cpu_start = time.thread_time()
+    text, headings = extract_sections(response.text)
+    cpu_ms = (time.thread_time() - cpu_start) * 1000
+
+    extraction_stats.record(len(response.content), response.truncated, cpu_ms)
+    logger.debug(f"Extracted {len(text)} chars from {url}: {len(response.content)} bytes"
+                 f"{' (truncated)' if response.truncated else ''}, {cpu_ms:.1f} ms CPU, sections {headings}")
+    return text